@@ -24,21 +24,16 @@ from stepler import config
 class IronicApiClient(base.BaseApiClient):
     """Ironic base API client."""
 
-    @property
-    def _endpoint(self):
-        return self._session.get_endpoint(service_type='baremetal').rstrip('/')
-
-    @property
-    def _auth_headers(self):
-        """Get auth headers.
-
-        Returns:
-            dict: authentication headers.
-        """
-        auth_headers = super(IronicApiClient, self)._auth_headers
-        auth_headers.update({
+    def __init__(self, *args, **kwgs):
+        """Constructor."""
+        super(IronicApiClient, self).__init__(*args, **kwgs)
+        # static headers are sent with each request of HTTP session
+        self._http.headers.update({
             'User-Agent': 'python-ironicclient',
             'X-OpenStack-Ironic-API-Version':
                 config.CURRENT_IRONIC_MICRO_VERSION
         })
-        return auth_headers
+
+    @property
+    def _endpoint(self):
+        return self._session.get_endpoint(service_type='baremetal').rstrip('/')
@@ -21,6 +21,7 @@ from ironicclient import client as client_v1
 import pytest
 
 from stepler.baremetal import api_clients
+from stepler.third_party import cache
 
 __all__ = [
     'api_ironic_client_v1',
@@ -33,22 +34,34 @@ __all__ = [
 def get_api_ironic_client(get_session):
     """Callable session fixture to get ironic client v1.
 
+    Clients are cached per version and keystone session. Use
+    ``get_api_ironic_client.invalidate()`` to drop cached clients.
+
     Args:
         get_session (function): function to get keystone session
 
     Returns:
         function: function to get ironic client v1
     """
-    def _get_api_ironic_client(version, is_api):
+    clients = cache.Cache('ironic API clients')
+
+    def _create_client(version, is_api, session):
         if version == '1':
             if is_api:
-                return api_clients.IronicApiClientV1(session=get_session())
+                return api_clients.IronicApiClientV1(session=session)
             else:
                 return client_v1.get_client(api_version=version,
-                                            session=get_session())
+                                            session=session)
 
         raise ValueError("Unexpected ironic version: {!r}".format(version))
 
+    def _get_api_ironic_client(version, is_api):
+        session = get_session()
+        return clients.get((version, is_api, session), _create_client,
+                           version, is_api, session)
+
+    _get_api_ironic_client.invalidate = clients.invalidate
+
     return _get_api_ironic_client
 
 
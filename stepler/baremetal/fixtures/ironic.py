@@ -21,6 +21,7 @@ from ironicclient import client
 import pytest
 
 from stepler import config
+from stepler.third_party import cache
 
 __all__ = [
     'get_ironic_client',
@@ -32,15 +33,27 @@ __all__ = [
 def get_ironic_client(get_session):
     """Callable session fixture to get ironic client.
 
+    Clients are cached per keystone session. Use
+    ``get_ironic_client.invalidate()`` to drop cached clients.
+
     Args:
         get_session (function): function to get authenticated ironic session
 
     Returns:
         function: function to get ironic client
     """
-    def _get_client(**credentials):
+    clients = cache.Cache('ironic clients')
+
+    def _create_client(session):
         return client.get_client(config.CURRENT_IRONIC_VERSION,
-                                 session=get_session(**credentials))
+                                 session=session)
+
+    def _get_client(**credentials):
+        session = get_session(**credentials)
+        return clients.get(session, _create_client, session)
+
+    _get_client.invalidate = clients.invalidate
+
     return _get_client
 
 
@@ -17,9 +17,14 @@ Base
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import types
 
 import requests
+from requests import adapters
+from requests.packages.urllib3.util import retry
+
+from stepler import config
 
 __all__ = [
     'BaseApiClient',
@@ -202,15 +207,73 @@ class BaseSteps(object):
 
 
 class BaseApiClient(object):
-    """Base API Client."""
+    """Base API Client.
+
+    Client keeps HTTP connections alive and reuses them among requests.
+    """
 
-    def __init__(self, session):
+    def __init__(self, session, pool_size=None, retries=None):
         """Constructor.
 
         Args:
           session (object): keystone session.
+          pool_size (int, optional): max count of kept alive connections.
+            By default ``config.API_CLIENT_POOL_SIZE``.
+          retries (int, optional): count of retries for failed connections.
+            By default ``config.API_CLIENT_RETRIES``.
         """
         self._session = session
+        self._endpoint_url = None
+
+        if pool_size is None:
+            pool_size = config.API_CLIENT_POOL_SIZE
+        if retries is None:
+            retries = config.API_CLIENT_RETRIES
+
+        adapter = adapters.HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry.Retry(
+                total=retries,
+                connect=retries,
+                read=0,  # don't repeat requests which reached server
+                backoff_factor=config.API_CLIENT_RETRY_BACKOFF))
+        self._http = requests.Session()
+        self._http.mount('http://', adapter)
+        self._http.mount('https://', adapter)
+
+    @classmethod
+    def _get_particular_methods(cls, name):
+        """Get class methods corresponding to particular request.
+
+        Methods are filtered once per class and request name.
+
+        Args:
+            name (str): Name of particular request, for ex: ``volumes``.
+
+        Returns:
+            dict: methods without request prefix and their functions.
+        """
+        # cache must belong to class itself, not to its parent
+        cache = cls.__dict__.get('_particular_methods')
+        if cache is None:
+            cache = {}
+            setattr(cls, '_particular_methods', cache)
+
+        methods = cache.get(name)
+        if methods is None:
+            matcher = name + '_'  # particular methods prefix
+            methods = {}
+
+            # filter methods corresponding to particular request
+            for attr, func in cls.__dict__.items():
+                if attr.startswith(matcher):
+
+                    new_attr = attr.split(matcher, 1)[-1]
+                    methods[new_attr] = func
+
+            cache[name] = methods
+        return methods
 
     def __getattr__(self, name):
         """Return new instance of API client.
@@ -222,6 +285,9 @@ class BaseApiClient(object):
         It allows to avoid redundant structure repetition and to provide full
         compatibility with python clients.
 
+        Created instance is stored as attribute of client, so it's built once
+        and next attribute calls don't reach ``__getattr__``.
+
         Args:
             name (str): Name of attribute.
 
@@ -233,24 +299,17 @@ class BaseApiClient(object):
             AttributeError: If attribute name doesn't match exisiting
                 attributes.
         """
-        matcher = name + '_'  # particular methods prefix
-        methods = {}
-
-        # filter methods corresponding to particular request
-        for attr, func in self.__class__.__dict__.items():
-            if attr.startswith(matcher):
-
-                new_attr = attr.split(matcher, 1)[-1]
-                methods[new_attr] = func
+        methods = self._get_particular_methods(name)
 
         if methods:
-            client = self.__class__(self._session)  # create clone of client
+            # create clone of client, which shares HTTP connections pool
+            client = copy.copy(self)
 
             # set particular methods to client
             for attr_name, func in methods.items():
-                method = types.MethodType(func, client, client.__class__)
-                setattr(client, attr_name, method)
+                setattr(client, attr_name, types.MethodType(func, client))
 
+            setattr(self, name, client)
             return client
         else:
             return super(BaseApiClient, self).__getattribute__(name)
@@ -278,58 +337,91 @@ class BaseApiClient(object):
         # TODO(schipiga): may be need to use native API
         raise NotImplemented
 
+    def _url(self, url):
+        """Get full URL of request.
+
+        Endpoint URL is resolved once per client.
+
+        Args:
+          url (str): relative URL.
+
+        Returns:
+          str: full URL.
+        """
+        if self._endpoint_url is None:
+            self._endpoint_url = self._endpoint
+        return self._endpoint_url + url
+
+    @property
+    def connection_stats(self):
+        """Get HTTP connections usage statistics.
+
+        Returns:
+          dict: count of ``requests``, opened ``connections`` and ``reused``
+            connections.
+        """
+        stats = {'requests': 0, 'connections': 0}
+        for adapter in set(self._http.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                stats['requests'] += pool.num_requests
+                stats['connections'] += pool.num_connections
+        stats['reused'] = stats['requests'] - stats['connections']
+        return stats
+
     def _head(self, url, headers=None, params=None, **kwgs):
         """HEAD request to API."""
         headers = headers or {}
         headers.update(self._auth_headers)
 
-        url = self._endpoint + url
-        return requests.head(url, headers=headers, params=params, **kwgs)
+        url = self._url(url)
+        return self._http.head(url, headers=headers, params=params, **kwgs)
 
     def _get(self, url, headers=None, params=None, **kwgs):
         """GET request to API."""
         headers = headers or {}
         headers.update(self._auth_headers)
 
-        url = self._endpoint + url
+        url = self._url(url)
 
-        return requests.get(url, headers=headers, params=params, **kwgs)
+        return self._http.get(url, headers=headers, params=params, **kwgs)
 
     def _put(self, url, headers=None, data=None, **kwgs):
         """PUT request to API."""
         headers = headers or {}
         headers.update(self._auth_headers)
 
-        url = self._endpoint + url
+        url = self._url(url)
 
-        return requests.put(url, headers=headers, data=data, **kwgs)
+        return self._http.put(url, headers=headers, data=data, **kwgs)
 
     def _post(self, url, headers=None, data=None, **kwgs):
         """POST request to API."""
         headers = headers or {}
         headers.update(self._auth_headers)
 
-        url = self._endpoint + url
+        url = self._url(url)
 
-        return requests.post(url, headers=headers, json=data, **kwgs)
+        return self._http.post(url, headers=headers, json=data, **kwgs)
 
     def _patch(self, url, headers=None, data=None, **kwgs):
         """PATCH request to API."""
         headers = headers or {}
         headers.update(self._auth_headers)
 
-        url = self._endpoint + url
+        url = self._url(url)
 
-        return requests.patch(url, headers=headers, data=data, **kwgs)
+        return self._http.patch(url, headers=headers, data=data, **kwgs)
 
     def _delete(self, url, headers=None, **kwgs):
         """DELETE request to API."""
         headers = headers or {}
         headers.update(self._auth_headers)
 
-        url = self._endpoint + url
+        url = self._url(url)
 
-        return requests.delete(url, headers=headers, **kwgs)
+        return self._http.delete(url, headers=headers, **kwgs)
 
 
 class Resource(object):
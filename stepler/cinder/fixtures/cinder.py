@@ -22,6 +22,7 @@ import pytest
 
 from stepler.cinder import api_clients
 from stepler import config
+from stepler.third_party import cache
 
 __all__ = [
     'cinder_client',
@@ -33,25 +34,36 @@ __all__ = [
 def get_cinder_client(get_session):
     """Callable session fixture to get cinder client.
 
+    Clients are cached per version and keystone session. Use
+    ``get_cinder_client.invalidate()`` to drop cached clients.
+
     Args:
         session (object): authenticated keystone session
 
     Returns:
         cinderclient.client.Client: instantiated cinder client
     """
-    def _get_cinder_client(version, is_api, **credentials):
+    clients = cache.Cache('cinder clients')
+
+    def _create_client(version, is_api, session):
         api_client = {
             '2': api_clients.ApiClientV2
         }[version]
 
-        session = get_session(**credentials)
-
-        if config.FORCE_API or is_api:
+        if is_api:
             return api_client(session)
         else:
             return cinderclient.Client(version=version, session=session,
                                        retries=0)
 
+    def _get_cinder_client(version, is_api, **credentials):
+        is_api = bool(config.FORCE_API or is_api)
+        session = get_session(**credentials)
+        return clients.get((version, is_api, session), _create_client,
+                           version, is_api, session)
+
+    _get_cinder_client.invalidate = clients.invalidate
+
     return _get_cinder_client
 
 
@@ -17,6 +17,9 @@ Volume steps
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import functools
+import time
 import uuid
 
 import attrdict
@@ -102,6 +105,14 @@ class VolumeSteps(base.BaseSteps):
                        check=True):
         """Step to create volumes.
 
+        Volumes are created by chunks of ``config.VOLUMES_CREATE_CHUNK``.
+        Create requests of chunk are sent concurrently by
+        ``config.VOLUMES_CREATE_WORKERS`` threads and then volumes of chunk are
+        waited together. Each created volume gets attribute ``create_timings``
+        with seconds spent to ``request`` creation and (if check is enabled)
+        seconds since chunk creation start until volume becomes
+        ``available``.
+
         Args:
             names (list): names of created volume, if not specified
                 one volume name will be generated
@@ -125,29 +136,40 @@ class VolumeSteps(base.BaseSteps):
         volumes = []
         _volume_names = {}
 
+        def _create_volume(name):
+            start = time.time()
+            volume = self._client.create(
+                size,
+                name=name,
+                imageRef=image_id,
+                volume_type=volume_type,
+                description=description,
+                source_volid=source_volid,
+                snapshot_id=snapshot_id,
+                metadata=metadata)
+            volume.create_timings = {'request': time.time() - start}
+            _volume_names[volume.id] = name
+            return volume
+
         for names_chunk in utils.grouper(names, config.VOLUMES_CREATE_CHUNK):
-            volumes_chunk = []
-            for name in names_chunk:
-                volume = self._client.create(
-                    size,
-                    name=name,
-                    imageRef=image_id,
-                    volume_type=volume_type,
-                    description=description,
-                    source_volid=source_volid,
-                    snapshot_id=snapshot_id,
-                    metadata=metadata)
-                _volume_names[volume.id] = name
-                volumes_chunk.append(volume)
+            chunk_start = time.time()
+            volumes_chunk = utils.run_concurrently(
+                _create_volume, names_chunk,
+                workers=config.VOLUMES_CREATE_WORKERS)
 
             if check:
+                wait_start = time.time() - chunk_start
+                elapsed = self.check_volume_status(
+                    volumes_chunk, [config.STATUS_AVAILABLE],
+                    transit_statuses=(config.STATUS_CREATING,
+                                      config.STATUS_DOWNLOADING,
+                                      config.STATUS_UPLOADING),
+                    timeout=config.VOLUME_AVAILABLE_TIMEOUT,
+                    polling=config.VOLUME_AVAILABLE_POLLING)
+
                 for volume in volumes_chunk:
-                    self.check_volume_status(
-                        volume, [config.STATUS_AVAILABLE],
-                        transit_statuses=(config.STATUS_CREATING,
-                                          config.STATUS_DOWNLOADING,
-                                          config.STATUS_UPLOADING),
-                        timeout=config.VOLUME_AVAILABLE_TIMEOUT)
+                    volume.create_timings['available'] = (
+                        wait_start + elapsed[volume.id])
 
                     if snapshot_id:
                         assert_that(volume.snapshot_id, equal_to(snapshot_id))
@@ -172,6 +194,12 @@ class VolumeSteps(base.BaseSteps):
     def delete_volumes(self, volumes, cascade=False, force=False, check=True):
         """Step to delete volumes.
 
+        Delete requests are sent concurrently by
+        ``config.VOLUMES_DELETE_WORKERS`` threads and then volumes are waited
+        together. Each volume gets attribute ``delete_timings`` with seconds
+        spent to ``request`` deletion and (if check is enabled) seconds since
+        deletion start until volume is ``deleted``.
+
         Args:
             volumes (list): cinder volumes
             cascade (bool): flag whether to delete dependent snapshot or not
@@ -179,59 +207,129 @@ class VolumeSteps(base.BaseSteps):
                 regardless of state
             check (bool): flag whether to check step or not
         """
-        for volume in volumes:
+        if not force:
+            self.check_volume_status(
+                volumes,
+                statuses=[config.STATUS_AVAILABLE, config.STATUS_ERROR],
+                transit_statuses=[
+                    config.STATUS_CREATING, config.STATUS_DELETING,
+                    config.STATUS_UPDATING
+                ],
+                timeout=config.VOLUME_IN_USE_TIMEOUT)
+
+        def _delete_volume(volume):
+            start = time.time()
             if force:
                 self._client.force_delete(volume.id)
             else:
-                self.check_volume_status(
-                    volume,
-                    statuses=[config.STATUS_AVAILABLE, config.STATUS_ERROR],
-                    transit_statuses=[
-                        config.STATUS_CREATING, config.STATUS_DELETING,
-                        config.STATUS_UPDATING
-                    ],
-                    timeout=config.VOLUME_IN_USE_TIMEOUT)
                 self._client.delete(volume.id, cascade=cascade)
+            volume.delete_timings = {'request': time.time() - start}
+
+        delete_start = time.time()
+        utils.run_concurrently(_delete_volume, volumes,
+                               workers=config.VOLUMES_DELETE_WORKERS)
 
         if check:
+            wait_start = time.time() - delete_start
+            elapsed = self.check_volume_presence(
+                volumes,
+                must_present=False,
+                timeout=config.VOLUME_DELETE_TIMEOUT,
+                polling=config.VOLUME_DELETE_POLLING)
+
             for volume in volumes:
-                self.check_volume_presence(
-                    volume,
-                    must_present=False,
-                    timeout=config.VOLUME_DELETE_TIMEOUT)
+                volume.delete_timings['deleted'] = (wait_start +
+                                                    elapsed[volume.id])
+
+    def _refresh_volumes(self, volumes):
+        """Refresh volumes data in place.
+
+        Several volumes are refreshed with one list request. Volumes which
+        are absent in list (for ex: volumes of other projects) are refreshed
+        one by one.
+
+        Args:
+            volumes (list): cinder volumes
+
+        Returns:
+            set: ids of absent volumes
+        """
+        fresh_volumes = {}
+        if len(volumes) > 1:
+            fresh_volumes = {fresh.id: fresh
+                             for fresh in self._client.list(detailed=True)}
+
+        absent = set()
+        for volume in volumes:
+            if volume.id in fresh_volumes:
+                volume._add_details(fresh_volumes[volume.id]._info)
+                continue
+            try:
+                volume.get()
+            except exceptions.NotFound:
+                absent.add(volume.id)
+        return absent
 
     @steps_checker.step
-    def check_volume_presence(self, volume, must_present=True, timeout=0):
+    def check_volume_presence(self, volume, must_present=True, timeout=0,
+                              polling=None):
         """Check step volume presence status.
 
         Args:
-            volume (object): cinder volume to check presence status
+            volume (object|list): cinder volume or volumes to check presence
+                status
             must_present (bool): flag whether volume should present or not
             timeout (int): seconds to wait a result of check
+            polling (waiter.Polling, optional): polling policy
+
+        Returns:
+            dict: seconds spent until each volume got expected presence by
+                volume id
 
         Raises:
             TimeoutExpired: if check failed after timeout
         """
-        def _check_volume_presence():
-            try:
-                self._client.get(volume.id)
-                is_present = True
-            except exceptions.NotFound:
-                is_present = False
+        volumes = volume if isinstance(volume, (list, tuple)) else [volume]
+        volumes = collections.OrderedDict(
+            (volume.id, volume) for volume in volumes)
+        absent = set()
+
+        def _refresh(volume_ids):
+            absent.clear()
+            absent.update(self._refresh_volumes(
+                [volumes[volume_id] for volume_id in volume_ids]))
+
+        def _check_volume_presence(volume):
+            is_present = volume.id not in absent
             return waiter.expect_that(is_present, equal_to(must_present))
 
-        waiter.wait(_check_volume_presence, timeout_seconds=timeout)
+        predicates = collections.OrderedDict(
+            (volume.id, functools.partial(_check_volume_presence, volume))
+            for volume in volumes.values())
+        results = waiter.wait_all(predicates, timeout_seconds=timeout,
+                                  polling=polling, refresh=_refresh)
+        return results.elapsed
 
     @steps_checker.step
     def check_volume_status(self, volume, statuses, transit_statuses=(),
-                            timeout=0):
+                            timeout=0, polling=None):
         """Check step volume status.
 
+        Volumes are polled together, so each volume is dropped from polling
+        once it leaves transit statuses.
+
         Args:
-            volume (object|str): cinder volume to check status or its id
+            volume (object|str|list): cinder volume to check status or its id
+                or list of them
             statuses (list): list of statuses to check
             transit_statuses (tuple): possible volume transitional statuses
             timeout (int): seconds to wait a result of check
+            polling (waiter.Polling, optional): polling policy, for ex:
+                ``config.VOLUME_AVAILABLE_POLLING``
+
+        Returns:
+            dict: seconds spent until each volume left transit statuses by
+                volume id
 
         Raises:
             TimeoutExpired|AssertionError: if check failed after timeout
@@ -239,17 +337,34 @@ class VolumeSteps(base.BaseSteps):
         transit_matchers = [equal_to_ignoring_case(status)
                             for status in transit_statuses]
 
-        if not hasattr(volume, 'id'):
-            volume = self.get_volume_by_id(volume)
+        volumes = volume if isinstance(volume, (list, tuple)) else [volume]
+        volumes = collections.OrderedDict(
+            (item.id, item) if hasattr(item, 'id') else
+            (item, self.get_volume_by_id(item)) for item in volumes)
+        absent = set()
 
-        def _check_volume_status():
-            volume.get()
+        def _refresh(volume_ids):
+            absent.clear()
+            absent.update(self._refresh_volumes(
+                [volumes[volume_id] for volume_id in volume_ids]))
+
+        def _check_volume_status(volume):
+            if volume.id in absent:
+                volume.get()  # raise NotFound
             return waiter.expect_that(volume.status,
                                       is_not(any_of(*transit_matchers)))
 
-        waiter.wait(_check_volume_status, timeout_seconds=timeout)
+        predicates = collections.OrderedDict(
+            (volume.id, functools.partial(_check_volume_status, volume))
+            for volume in volumes.values())
+        results = waiter.wait_all(predicates, timeout_seconds=timeout,
+                                  polling=polling, refresh=_refresh)
+
         matchers = [equal_to_ignoring_case(status) for status in statuses]
-        assert_that(volume.status, any_of(*matchers))
+        for volume in volumes.values():
+            assert_that(volume.status, any_of(*matchers))
+
+        return results.elapsed
 
     @steps_checker.step
     def get_volumes(self,
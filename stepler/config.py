@@ -26,6 +26,7 @@ import uuid
 from six.moves.urllib.parse import urlparse
 
 from stepler.third_party.utils import generate_ids
+from stepler.third_party.waiter import Polling
 
 BASE_PREFIX = os.environ.get('BASE_PREFIX', 'stepler')
 STEPLER_PREFIX = '{}-{}'.format(
@@ -78,6 +79,11 @@ CUSTOM_PING_COMMAND_PATH = '/usr/bin/fix_id_ping'
 
 FORCE_API = bool(os.environ.get('FORCE_API_USAGE'))
 
+# HTTP connections of API clients
+API_CLIENT_POOL_SIZE = int(os.environ.get('API_CLIENT_POOL_SIZE', 10))
+API_CLIENT_RETRIES = int(os.environ.get('API_CLIENT_RETRIES', 3))
+API_CLIENT_RETRY_BACKOFF = 0.5
+
 # TODO(schipiga): copied from mos-integration-tests, need refactor.
 TEST_IMAGE_PATH = os.environ.get("TEST_IMAGE_PATH",
                                  os.path.expanduser('~/images'))
@@ -175,8 +181,13 @@ STATUS_UPLOADING = 'uploading'
 STATUS_VERIFY_RESIZE = 'verify_resize'
 
 # TIMEOUTS (in seconds)
-# TODO(kromanenko): Investigate less intensive good polling interval value.
-POLLING_TIME = 1
+# Default polling policy: delay starts with POLLING_TIME, is multiplied by
+# POLLING_MULTIPLIER after each poll up to POLLING_MAX_TIME and is randomly
+# changed by POLLING_JITTER fraction.
+POLLING_TIME = float(os.environ.get('POLLING_TIME', 1))
+POLLING_MULTIPLIER = float(os.environ.get('POLLING_MULTIPLIER', 1.5))
+POLLING_MAX_TIME = float(os.environ.get('POLLING_MAX_TIME', 10))
+POLLING_JITTER = float(os.environ.get('POLLING_JITTER', 0.1))
 
 # Cinder
 VOLUME_AVAILABLE_TIMEOUT = 5 * 60
@@ -202,6 +213,12 @@ BACKUP_DELETE_TIMEOUT = 3 * 60
 TRANSFER_CREATE_TIMEOUT = 3 * 60
 TRANSFER_SHOW_TIMEOUT = 60
 VOLUMES_CREATE_CHUNK = 5
+# Max count of concurrent create/delete requests, 1 means serial requests
+VOLUMES_CREATE_WORKERS = int(os.environ.get('VOLUMES_CREATE_WORKERS',
+                                            VOLUMES_CREATE_CHUNK))
+VOLUMES_DELETE_WORKERS = int(os.environ.get('VOLUMES_DELETE_WORKERS', 5))
+VOLUME_AVAILABLE_POLLING = Polling(delay=2, max_delay=10)
+VOLUME_DELETE_POLLING = Polling(delay=1, max_delay=5)
 
 # Glance
 IMAGE_AVAILABLE_TIMEOUT = 5 * 60
@@ -288,6 +305,8 @@ REBOOT_HARD = 'HARD'
 CONFIM_RESIZE_STATUS = 'Confirm or Revert Resize/Migrate'
 
 KEYSTONE_AVAILABILITY_TIMEOUT = 10 * 60
+# Cached keystone token is renewed when it expires in less than this time
+KEYSTONE_TOKEN_RENEW_TIME = 5 * 60
 NOVA_AVAILABILITY_TIMEOUT = 10 * 60
 NEUTRON_AVAILABILITY_TIMEOUT = 5 * 60
 CINDER_AVAILABILITY_TIMEOUT = 30
@@ -349,6 +368,11 @@ USER_FILES_FOR_TEST_REBUILD = {"/home/ubuntu/file1.txt": 'Test file 1',
 DESCRIPTION_FOR_TEST_REBUILD = "Description added during rebuild"
 
 SERVERS_CREATE_CHUNK = 5
+# Max count of concurrent create requests inside chunk, 1 means serial creation
+SERVERS_CREATE_WORKERS = int(os.environ.get('SERVERS_CREATE_WORKERS',
+                                            SERVERS_CREATE_CHUNK))
+SERVER_BUILD_POLLING = Polling(delay=3, max_delay=15)
+SERVER_DELETE_POLLING = Polling(delay=1, max_delay=5)
 LIVE_MIGRATE_MAX_SERVERS_COUNT = 10
 
 DPDK_ENABLED = bool(os.environ.get('DPDK_ENABLED', False))
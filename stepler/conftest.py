@@ -79,6 +79,7 @@ __all__ = sorted([  # sort for documentation
     'volumes',
     'volume_steps',
 
+    'get_heat_client',
     'heat_client',
     'stack_steps',
     'create_stack',
@@ -25,6 +25,7 @@ import pytest
 from requests.packages import urllib3
 
 from stepler import config
+from stepler.third_party import cache
 from stepler.third_party import waiter
 
 __all__ = [
@@ -38,7 +39,11 @@ __all__ = [
 def get_session(credentials):
     """Callable session fixture to get keystone session.
 
-    Can be called several times during a test to regenerate keystone session.
+    Sessions are cached per credentials (auth URL, username, password,
+    project, domains and cert) and shared among tests, so keystone token is
+    issued once and reused. Cached session token is renewed in advance, when
+    it expires in less than ``config.KEYSTONE_TOKEN_RENEW_TIME`` seconds.
+    Cache is invalidated after cloud revert in destructive tests.
 
     Args:
         credentials (object): CredentialsManager instance
@@ -89,22 +94,15 @@ def get_session(credentials):
             is_available = False
         return waiter.expect_that(is_available)
 
-    def _get_session(auth_url=None,
-                     username=None,
-                     password=None,
-                     project_name=None,
-                     user_domain_name=None,
-                     project_domain_name=None,
-                     cert=None):
-        # TODO(agromov): replace params usage with credentials fixture
-        auth_url = auth_url or config.AUTH_URL
-        username = username or credentials.username
-        password = password or credentials.password
-        project_name = project_name or credentials.project_name
-        user_domain_name = user_domain_name or credentials.user_domain_name
-        project_domain_name = (project_domain_name or
-                               credentials.project_domain_name)
+    sessions = cache.Cache('keystone sessions')
 
+    def _is_token_expiring(session):
+        auth_ref = session.auth.auth_ref
+        return (auth_ref is None or
+                auth_ref.will_expire_soon(config.KEYSTONE_TOKEN_RENEW_TIME))
+
+    def _create_session(auth_url, username, password, project_name,
+                        user_domain_name, project_domain_name, cert):
         if config.KEYSTONE_API_VERSION == 3:
 
             auth = identity.v3.Password(
@@ -138,6 +136,40 @@ def get_session(credentials):
                     timeout_seconds=config.KEYSTONE_AVAILABILITY_TIMEOUT)
         return session
 
+    def _get_session(auth_url=None,
+                     username=None,
+                     password=None,
+                     project_name=None,
+                     user_domain_name=None,
+                     project_domain_name=None,
+                     cert=None,
+                     cached=True):
+        # TODO(agromov): replace params usage with credentials fixture
+        auth_url = auth_url or config.AUTH_URL
+        username = username or credentials.username
+        password = password or credentials.password
+        project_name = project_name or credentials.project_name
+        user_domain_name = user_domain_name or credentials.user_domain_name
+        project_domain_name = (project_domain_name or
+                               credentials.project_domain_name)
+        if isinstance(cert, list):
+            cert = tuple(cert)
+
+        key = (auth_url, username, password, project_name, user_domain_name,
+               project_domain_name, cert)
+
+        if not cached:
+            sessions.invalidate(key)
+
+        session = sessions.get(key, _create_session, *key)
+
+        if _is_token_expiring(session):
+            session.invalidate()
+            waiter.wait(_check_keystone_available,
+                        args=(session,),
+                        timeout_seconds=config.KEYSTONE_AVAILABILITY_TIMEOUT)
+        return session
+
     return _get_session
 
 
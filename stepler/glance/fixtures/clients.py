@@ -22,6 +22,7 @@ from glanceclient.v2 import client as client_v2
 import pytest
 
 from stepler.glance import api_clients
+from stepler.third_party import cache
 
 __all__ = [
     'api_glance_client_v1',
@@ -36,27 +37,39 @@ __all__ = [
 def get_glance_client(get_session):
     """Callable session fixture to get glance client v1.
 
+    Clients are cached per version and keystone session. Use
+    ``get_glance_client.invalidate()`` to drop cached clients.
+
     Args:
         get_session (function): function to get keystone session
 
     Returns:
         function: function to get glance client v1
     """
-    def _get_glance_client(version, is_api):
+    clients = cache.Cache('glance clients')
+
+    def _create_client(version, is_api, session):
         if version == '1':
             if is_api:
-                return api_clients.ApiClientV1(session=get_session())
+                return api_clients.ApiClientV1(session=session)
             else:
-                return client_v1.Client(session=get_session())
+                return client_v1.Client(session=session)
 
         if version == '2':
             if is_api:
-                return api_clients.ApiClientV2(session=get_session())
+                return api_clients.ApiClientV2(session=session)
             else:
-                return client_v2.Client(session=get_session())
+                return client_v2.Client(session=session)
 
         raise ValueError("Unexpected glance version: {!r}".format(version))
 
+    def _get_glance_client(version, is_api):
+        session = get_session()
+        return clients.get((version, is_api, session), _create_client,
+                           version, is_api, session)
+
+    _get_glance_client.invalidate = clients.invalidate
+
     return _get_glance_client
 
 
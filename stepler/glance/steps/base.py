@@ -17,6 +17,9 @@ Glance base steps
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import functools
+
 import glanceclient.v1.images
 from hamcrest import assert_that, equal_to, has_entries  # noqa
 import warlock.model
@@ -41,19 +44,39 @@ class BaseGlanceSteps(base.BaseSteps):
 
     def _refresh_image(self, image):
         """Refresh local image data structure according to its type."""
-        if isinstance(image, (glanceclient.v1.images.Image,
-                              warlock.model.Model)):  # glanceclient
+        if self._refresh_images([image]):
+            raise NotFound()
 
-            images = [image_ for image_ in self._client.images.list()
-                      if image_.id == image.id]
-            if len(images) == 0:
-                raise NotFound()
-            fresh = images[0]
-            data = getattr(fresh, '_info', fresh)
-            getattr(image, '_info', image).update(data)
+    def _refresh_images(self, images):
+        """Refresh local images data structures with one list request.
+
+        Args:
+            images (list): glance images
+
+        Returns:
+            set: ids of absent images
+        """
+        fresh_images = None
+        absent = set()
+
+        for image in images:
+            if isinstance(image, (glanceclient.v1.images.Image,
+                                  warlock.model.Model)):  # glanceclient
 
-        else:  # stepler.base.Resource
-            image.get()
+                if fresh_images is None:
+                    fresh_images = {fresh.id: fresh
+                                    for fresh in self._client.images.list()}
+                if image.id not in fresh_images:
+                    absent.add(image.id)
+                    continue
+                fresh = fresh_images[image.id]
+                data = getattr(fresh, '_info', fresh)
+                getattr(image, '_info', image).update(data)
+
+            else:  # stepler.base.Resource
+                image.get()
+
+        return absent
 
     @steps_checker.step
     def update_images(self, images, status=None, check=True, **kwargs):
@@ -131,16 +154,16 @@ class BaseGlanceSteps(base.BaseSteps):
             for image in images:
                 if kwargs:
                     assert_that(image, has_entries(kwargs))
-                if upload:
-                    self.check_image_status(
-                        image,
-                        config.STATUS_ACTIVE,
-                        timeout=config.IMAGE_AVAILABLE_TIMEOUT)
-                else:
-                    self.check_image_status(
-                        image,
-                        config.STATUS_QUEUED,
-                        timeout=config.IMAGE_QUEUED_TIMEOUT)
+            if upload:
+                self.check_image_status(
+                    images,
+                    config.STATUS_ACTIVE,
+                    timeout=config.IMAGE_AVAILABLE_TIMEOUT)
+            else:
+                self.check_image_status(
+                    images,
+                    config.STATUS_QUEUED,
+                    timeout=config.IMAGE_QUEUED_TIMEOUT)
 
         return images
 
@@ -149,19 +172,33 @@ class BaseGlanceSteps(base.BaseSteps):
         """Check step image status.
 
         Args:
-            image (object): glance image to check status
+            image (object|list): glance image or images to check status
             status (str): image status name to check
             timeout (int): seconds to wait a result of check
 
         Raises:
             TimeoutExpired: if check failed after timeout
         """
-        def _check_image_status():
-            self._refresh_image(image)
+        images = image if isinstance(image, (list, tuple)) else [image]
+        images = collections.OrderedDict(
+            (image.id, image) for image in images)
+        absent = set()
+
+        def _refresh(image_ids):
+            absent.clear()
+            absent.update(self._refresh_images(
+                [images[image_id] for image_id in image_ids]))
+
+        def _check_image_status(image):
+            if image.id in absent:
+                raise NotFound()
             return waiter.expect_that(image.status.lower(),
                                       equal_to(status.lower()))
 
-        waiter.wait(_check_image_status, timeout_seconds=timeout)
+        predicates = collections.OrderedDict(
+            (image.id, functools.partial(_check_image_status, image))
+            for image in images.values())
+        waiter.wait_all(predicates, timeout_seconds=timeout, refresh=_refresh)
 
     @steps_checker.step
     def delete_images(self, images, check=True):
@@ -175,31 +212,39 @@ class BaseGlanceSteps(base.BaseSteps):
             self._client.images.delete(image.id)
 
         if check:
-            for image in images:
-                self.check_image_presence(
-                    image,
-                    must_present=False,
-                    timeout=config.IMAGE_AVAILABLE_TIMEOUT)
+            self.check_image_presence(
+                images,
+                must_present=False,
+                timeout=config.IMAGE_AVAILABLE_TIMEOUT)
 
     @steps_checker.step
     def check_image_presence(self, image, must_present=True, timeout=0):
         """Check step image presence status.
 
         Args:
-            image (object): glance image to check presence status
+            image (object|list): glance image or images to check presence
+                status
             must_present (bool): flag whether image should present or not
             timeout (int): seconds to wait a result of check
 
         Raises:
             TimeoutExpired: if check failed after timeout
         """
-        def _check_image_presence():
-            try:
-                self._refresh_image(image)
-                is_present = True
-            except NotFound:
-                is_present = False
-
+        images = image if isinstance(image, (list, tuple)) else [image]
+        images = collections.OrderedDict(
+            (image.id, image) for image in images)
+        absent = set()
+
+        def _refresh(image_ids):
+            absent.clear()
+            absent.update(self._refresh_images(
+                [images[image_id] for image_id in image_ids]))
+
+        def _check_image_presence(image):
+            is_present = image.id not in absent
             return waiter.expect_that(is_present, equal_to(must_present))
 
-        waiter.wait(_check_image_presence, timeout_seconds=timeout)
+        predicates = collections.OrderedDict(
+            (image.id, functools.partial(_check_image_presence, image))
+            for image in images.values())
+        waiter.wait_all(predicates, timeout_seconds=timeout, refresh=_refresh)
@@ -24,6 +24,7 @@ from .resource import *  # noqa
 from .resource_types import *  # noqa
 
 __all__ = sorted([  # sort for documentation
+    'get_heat_client',
     'heat_client',
 
     'stack_steps',
@@ -21,22 +21,55 @@ from heatclient import client as heatclient
 import pytest
 
 from stepler import config
+from stepler.third_party import cache
 
-__all__ = ['heat_client']
+__all__ = [
+    'get_heat_client',
+    'heat_client',
+]
+
+
+@pytest.fixture(scope='session')
+def get_heat_client(get_session):
+    """Callable session fixture to get heat client.
+
+    Heat client is authenticated with token, so clients are cached per
+    keystone session and its current token. Use
+    ``get_heat_client.invalidate()`` to drop cached clients.
+
+    Args:
+        get_session (function): function to get authenticated keystone
+            session
+
+    Returns:
+        function: function to get heat client
+    """
+    clients = cache.Cache('heat clients')
+
+    def _create_client(session, token):
+        endpoint_url = session.get_endpoint(
+            service_type='orchestration', endpoint_type='publicURL')
+        return heatclient.Client(
+            version=config.HEAT_VERSION, endpoint=endpoint_url, token=token)
+
+    def _get_heat_client(**credentials):
+        session = get_session(**credentials)
+        token = session.get_token()
+        return clients.get((session, token), _create_client, session, token)
+
+    _get_heat_client.invalidate = clients.invalidate
+
+    return _get_heat_client
 
 
 @pytest.fixture
-def heat_client(session):
+def heat_client(get_heat_client):
     """Function fixture to get heat client.
 
     Args:
-        session (object): authenticated keystone session
+        get_heat_client (function): function to get heat client
 
     Returns:
         heatclient.Client: instantiated heat client
     """
-    token = session.get_token()
-    endpoint_url = session.get_endpoint(
-        service_type='orchestration', endpoint_type='publicURL')
-    return heatclient.Client(
-        version=config.HEAT_VERSION, endpoint=endpoint_url, token=token)
+    return get_heat_client()
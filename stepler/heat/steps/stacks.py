@@ -17,6 +17,9 @@ Heat stack steps
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import functools
+
 from hamcrest import assert_that, equal_to, is_in, is_not, empty, only_contains  # noqa
 
 from stepler import base
@@ -63,24 +66,55 @@ class StackSteps(base.BaseSteps):
 
         return stack
 
+    def _refresh_stacks(self, stacks):
+        """Refresh stacks data in place.
+
+        Several stacks are refreshed with one list request filtered by ids.
+        Stacks which are absent in list are refreshed one by one.
+
+        Args:
+            stacks (list): heat stacks
+        """
+        fresh_stacks = {}
+        if len(stacks) > 1:
+            fresh_stacks = {
+                fresh.id: fresh for fresh in self._client.stacks.list(
+                    id=[stack.id for stack in stacks])}
+
+        for stack in stacks:
+            if stack.id in fresh_stacks:
+                stack._add_details(fresh_stacks[stack.id]._info)
+            else:
+                stack.get()
+
     def _get_property(self, stack, property_name, transit_values=(),
                       timeout=0):
+        stacks = stack if isinstance(stack, (list, tuple)) else [stack]
+        stacks = collections.OrderedDict(
+            (stack_.id, stack_) for stack_ in stacks)
 
-        def _get_prop():
-            stack.get()
+        def _refresh(stack_ids):
+            self._refresh_stacks([stacks[stack_id] for stack_id in stack_ids])
+
+        def _get_prop(stack):
             return waiter.expect_that(
                 getattr(stack, property_name).lower(),
                 is_not(is_in(transit_values)))
 
-        waiter.wait(_get_prop, timeout_seconds=timeout)
-        return getattr(stack, property_name)
+        predicates = collections.OrderedDict(
+            (stack_.id, functools.partial(_get_prop, stack_))
+            for stack_ in stacks.values())
+        waiter.wait_all(predicates, timeout_seconds=timeout, refresh=_refresh)
+
+        values = [getattr(stack_, property_name) for stack_ in stacks.values()]
+        return values if isinstance(stack, (list, tuple)) else values[0]
 
     @steps_checker.step
     def check_status(self, stack, status, transit_statuses=(), timeout=0):
         """Verify step to check stack's `status` property.
 
         Args:
-            stack (obj): heat stack to check its status
+            stack (obj|list): heat stack or stacks to check status
             status (str): expected stack status
             transit_statuses (iterable): allowed transit statuses
             timeout (int): seconds to wait a result of check
@@ -88,14 +122,16 @@ class StackSteps(base.BaseSteps):
         Raises:
             TimeoutExpired|AssertionError: if check failed after timeout
         """
+        stacks = stack if isinstance(stack, (list, tuple)) else [stack]
 
-        value = self._get_property(
-            stack,
+        values = self._get_property(
+            stacks,
             'status',
             transit_values=transit_statuses,
             timeout=timeout)
-        msg = getattr(stack, 'stack_status_reason', None)
-        assert_that(value.lower(), equal_to(status.lower()), msg)
+        for stack, value in zip(stacks, values):
+            msg = getattr(stack, 'stack_status_reason', None)
+            assert_that(value.lower(), equal_to(status.lower()), msg)
 
     @steps_checker.step
     def check_stack_status(self, stack, status, transit_statuses=(),
@@ -163,25 +199,34 @@ class StackSteps(base.BaseSteps):
         """Check-step to check heat stack presence.
 
         Args:
-            stack (obj|str): heat stack object or id
+            stack (obj|str|list): heat stack object or id or list of them
             must_present (bool): flag to check is stack present or absent
             timeout (int): seconds to wait a result of check
 
         Raises:
             TimeoutExpired: if check failed after timeout
         """
-        if hasattr(stack, 'id'):
-            stack = stack.id
+        stacks = stack if isinstance(stack, (list, tuple)) else [stack]
+        stack_ids = [getattr(stack_, 'id', stack_) for stack_ in stacks]
+        present_ids = set()
+
+        def _refresh(stack_ids):
+            present_ids.clear()
+            present_ids.update(
+                stack_.id for stack_ in self._client.stacks.list(id=stack_ids))
 
-        def _check_presence():
-            stacks = list(self._client.stacks.list(id=stack))
+        def _check_presence(stack_id):
+            stacks = [stack_id] if stack_id in present_ids else []
             matcher = empty()
             if must_present:
                 matcher = is_not(matcher)
 
             return waiter.expect_that(stacks, matcher)
 
-        waiter.wait(_check_presence, timeout_seconds=timeout)
+        predicates = collections.OrderedDict(
+            (stack_id, functools.partial(_check_presence, stack_id))
+            for stack_id in stack_ids)
+        waiter.wait_all(predicates, timeout_seconds=timeout, refresh=_refresh)
 
     @steps_checker.step
     def get_output(self, stack, output_key, check=True):
@@ -21,6 +21,8 @@ import pytest
 
 from keystoneclient import client
 
+from stepler.third_party import cache
+
 __all__ = [
     'get_keystone_client',
     'keystone_client',
@@ -31,6 +33,9 @@ __all__ = [
 def get_keystone_client(get_session):
     """Callable session fixture to get keystone client.
 
+    Clients are cached per keystone session. Use
+    ``get_keystone_client.invalidate()`` to drop cached clients.
+
     Args:
         get_session (function): function to get authenticated keystone
             session
@@ -38,8 +43,14 @@ def get_keystone_client(get_session):
     Returns:
         function: function to get keystone client
     """
+    clients = cache.Cache('keystone clients')
+
     def _get_client(**credentials):
-        return client.Client(session=get_session(**credentials))
+        session = get_session(**credentials)
+        return clients.get(session, client.Client, session=session)
+
+    _get_client.invalidate = clients.invalidate
+
     return _get_client
 
 
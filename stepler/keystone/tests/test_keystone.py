@@ -111,7 +111,7 @@ def test_restart_keystone_service(cirros_image,
     os_faults_steps.restart_services([config.KEYSTONE])
 
     # Wait until keystone wake up
-    get_session()
+    get_session(cached=False)
     time.sleep(config.TIME_AFTER_KEYSTONE_RESTART)
 
     user_steps.check_user_presence(user)
@@ -23,6 +23,7 @@ import pytest
 
 from stepler import config
 from stepler.neutron.client import client
+from stepler.third_party import cache
 from stepler.third_party import waiter
 
 __all__ = [
@@ -37,6 +38,10 @@ __all__ = [
 def get_neutron_client(get_session):
     """Callable session fixture to get neutron client wrapper.
 
+    Clients are cached per keystone session. Use
+    ``get_neutron_client.invalidate()`` to drop cached clients, for ex: to
+    wait for neutron availability after its restart.
+
     Args:
         get_session (function): function to get authenticated keystone
             session
@@ -44,19 +49,27 @@ def get_neutron_client(get_session):
     Returns:
         function: function to get instantiated neutron client wrapper
     """
-    def _wait_client_availability(**credentials):
-        rest_client = Client(session=get_session(**credentials))
+    clients = cache.Cache('neutron clients')
+
+    def _wait_client_availability(session):
+        rest_client = Client(session=session)
         neutron_client = client.NeutronClient(rest_client)
         neutron_client.networks.find_all()
         return neutron_client
 
-    def _get_neutron_client(**credentials):
+    def _create_client(session):
         return waiter.wait(
             _wait_client_availability,
-            kwargs=credentials,
+            args=(session,),
             timeout_seconds=config.NEUTRON_AVAILABILITY_TIMEOUT,
             expected_exceptions=exceptions.NeutronClientException)
 
+    def _get_neutron_client(**credentials):
+        session = get_session(**credentials)
+        return clients.get(session, _create_client, session)
+
+    _get_neutron_client.invalidate = clients.invalidate
+
     return _get_neutron_client
 
 
@@ -134,6 +147,7 @@ def set_dhcp_agents_count_for_net(request,
             nodes,
             timeout=config.SERVICE_START_TIMEOUT)
         # wait for neutron availability
+        get_neutron_client.invalidate()
         get_neutron_client()
 
         yield
@@ -142,4 +156,5 @@ def set_dhcp_agents_count_for_net(request,
                                         nodes,
                                         timeout=config.SERVICE_START_TIMEOUT)
     # wait for neutron availability
+    get_neutron_client.invalidate()
     get_neutron_client()
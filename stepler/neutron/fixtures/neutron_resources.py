@@ -530,6 +530,16 @@ def create_max_networks_with_instances(cirros_image,
     Returns:
         function: function to create max count of networks
     """
+    def _check_and_delete_servers(servers):
+        if servers:
+            server_steps.check_server_status(
+                servers,
+                expected_statuses=[config.STATUS_ACTIVE],
+                transit_statuses=[config.STATUS_BUILD],
+                timeout=config.SERVER_ACTIVE_TIMEOUT,
+                polling=config.SERVER_BUILD_POLLING)
+        server_steps.delete_servers(servers)
+
     def _create_max_networks_with_instances(router):
         max_instances = 0
         for hypervisor in sorted_hypervisors:
@@ -556,19 +566,21 @@ def create_max_networks_with_instances(cirros_image,
                 net_list.append(network)
 
                 if len(servers) >= max_instances:
-                    server_steps.delete_servers(servers)
+                    _check_and_delete_servers(servers)
                     servers = []
 
+                # servers are checked together before deletion
                 server = server_steps.create_servers(
                     image=cirros_image,
                     flavor=flavor,
                     networks=[network],
-                    security_groups=[security_group])[0]
+                    security_groups=[security_group],
+                    check=False)[0]
                 servers.append(server)
         except (exceptions.ServiceUnavailable, exceptions.OverQuotaClient):
             pass
 
-        server_steps.delete_servers(servers)
+        _check_and_delete_servers(servers)
 
         return net_list
 
@@ -907,6 +907,7 @@ def test_check_port_binding_after_node_restart(
 
     os_faults_steps.poweroff_nodes(nodes_with_dhcp)
     # wait for neutron availability
+    get_neutron_client.invalidate()
     get_neutron_client()
 
     agent_steps.check_alive([dhcp_agent],
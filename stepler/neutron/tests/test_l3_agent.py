@@ -616,6 +616,7 @@ def test_check_l3_agent_after_destroy_controller(
 
     os_faults_steps.poweroff_nodes(controller)
     # wait for neutron availability
+    get_neutron_client.invalidate()
     get_neutron_client()
 
     agent_steps.check_alive([l3_agent],
@@ -724,6 +725,7 @@ def test_check_l3_agent_after_reset_primary_controller(
 
     os_faults_steps.reset_nodes(controller)
     # wait for neutron availability
+    get_neutron_client.invalidate()
     get_neutron_client()
 
     agent_steps.check_alive([l3_agent],
@@ -24,6 +24,7 @@ from novaclient import exceptions as nova_exceptions
 import pytest
 
 from stepler import config
+from stepler.third_party import cache
 from stepler.third_party import waiter
 
 __all__ = [
@@ -43,6 +44,10 @@ __all__ = [
 def get_nova_client(get_session):
     """Callable session fixture to get nova client.
 
+    Clients are cached per keystone session, so nova API microversion is
+    negotiated once. Use ``get_nova_client.invalidate()`` to drop cached
+    clients, for ex: to wait for nova availability after its restart.
+
     Args:
         get_session (keystoneauth1.session.Session): authenticated keystone
             session
@@ -50,25 +55,30 @@ def get_nova_client(get_session):
     Returns:
         function: function to get nova client
     """
+    clients = cache.Cache('nova clients')
 
-    def _wait_client_availability(**credentials):
-        client = Client(
-            version=config.CURRENT_NOVA_VERSION,
-            session=get_session(**credentials))
+    def _wait_client_availability(session):
+        client = Client(version=config.CURRENT_NOVA_VERSION, session=session)
 
         current_microversion = client.versions.find(status='CURRENT').version
         client.api_version = APIVersion(current_microversion)
 
         return client
 
-    def _get_nova_client(**credentials):
+    def _create_client(session):
         return waiter.wait(
             _wait_client_availability,
-            kwargs=credentials,
+            args=(session,),
             timeout_seconds=config.NOVA_AVAILABILITY_TIMEOUT,
             expected_exceptions=(keystone_exceptions.ClientException,
                                  nova_exceptions.ClientException))
 
+    def _get_nova_client(**credentials):
+        session = get_session(**credentials)
+        return clients.get(session, _create_client, session)
+
+    _get_nova_client.invalidate = clients.invalidate
+
     return _get_nova_client
 
 
@@ -102,17 +112,20 @@ def change_nova_config(option, value, scope='function', services=None):
 
     @pytest.fixture(scope=scope)
     def _change_nova_config(patch_ini_file_and_restart_services,
+                            get_nova_client,
                             get_availability_zone_steps):
         with patch_ini_file_and_restart_services(
                 services,
                 file_path=config.NOVA_CONFIG_PATH,
                 option=option,
                 value=value):
+            get_nova_client.invalidate()
             zone_steps = get_availability_zone_steps()
             zone_steps.check_all_active_hosts_available()
 
             yield
 
+        get_nova_client.invalidate()
         zone_steps = get_availability_zone_steps()
         zone_steps.check_all_active_hosts_available()
 
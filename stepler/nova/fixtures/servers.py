@@ -434,12 +434,12 @@ def live_migration_servers(
                 **kwargs)[0]
             servers_group.append(server)
 
-        for server in servers_group:
-            server_steps.check_server_status(
-                server,
-                expected_statuses=[config.STATUS_ACTIVE],
-                transit_statuses=[config.STATUS_BUILD],
-                timeout=config.SERVER_ACTIVE_TIMEOUT)
+        server_steps.check_server_status(
+            servers_group,
+            expected_statuses=[config.STATUS_ACTIVE],
+            transit_statuses=[config.STATUS_BUILD],
+            timeout=config.SERVER_ACTIVE_TIMEOUT,
+            polling=config.SERVER_BUILD_POLLING)
 
         servers.extend(servers_group)
 
@@ -626,9 +626,17 @@ def servers_to_evacuate(request,
             security_groups=[security_group],
             username=config.CIRROS_USERNAME,
             availability_zone='nova:{}'.format(hypervisor.service['host']),
+            check=False,
             **kwargs)[0]
         servers.append(server)
 
+    server_steps.check_server_status(
+        servers,
+        expected_statuses=[config.STATUS_ACTIVE],
+        transit_statuses=[config.STATUS_BUILD],
+        timeout=config.SERVER_ACTIVE_TIMEOUT,
+        polling=config.SERVER_BUILD_POLLING)
+
     for server in servers:
         server_steps.attach_floating_ip(server, create_floating_ip())
     return servers
@@ -19,8 +19,10 @@ Server steps
 
 import collections
 import contextlib
+import functools
 import itertools
 import os
+import re
 import socket
 import time
 
@@ -70,6 +72,14 @@ class ServerSteps(base.BaseSteps):
                        check=True):
         """Step to create servers.
 
+        Servers are created by chunks of ``config.SERVERS_CREATE_CHUNK``.
+        Create requests of chunk are sent concurrently by
+        ``config.SERVERS_CREATE_WORKERS`` threads and then servers of chunk
+        are waited together. Each created server gets attribute
+        ``boot_timings`` with seconds spent to ``request`` creation and (if
+        check is enabled) seconds since chunk creation start until server
+        becomes ``active``.
+
         Args:
             image (object|None): image or None (to use volume)
             flavor (object): flavor
@@ -122,32 +132,42 @@ class ServerSteps(base.BaseSteps):
         }
         meta = chunk_serializer.dump(credentials, config.CREDENTIALS_PREFIX)
 
+        def _create_server(server_name):
+            start = time.time()
+            server = self._client.create(
+                name=server_name,
+                image=image_id,
+                flavor=flavor.id,
+                nics=nics,
+                key_name=keypair_id,
+                availability_zone=availability_zone,
+                security_groups=sec_groups,
+                block_device_mapping=block_device_mapping,
+                userdata=userdata,
+                meta=meta)
+            server.boot_timings = {'request': time.time() - start}
+            return server
+
         servers = []
         for name_chunk in utils.grouper(server_names,
                                         config.SERVERS_CREATE_CHUNK):
-            servers_chunk = []
-            for server_name in name_chunk:
-                server = self._client.create(
-                    name=server_name,
-                    image=image_id,
-                    flavor=flavor.id,
-                    nics=nics,
-                    key_name=keypair_id,
-                    availability_zone=availability_zone,
-                    security_groups=sec_groups,
-                    block_device_mapping=block_device_mapping,
-                    userdata=userdata,
-                    meta=meta)
-                servers_chunk.append(server)
+            chunk_start = time.time()
+            servers_chunk = utils.run_concurrently(
+                _create_server, name_chunk,
+                workers=config.SERVERS_CREATE_WORKERS)
 
             if check:
-                for server in servers_chunk:
+                wait_start = time.time() - chunk_start
+                elapsed = self.check_server_status(
+                    servers_chunk,
+                    expected_statuses=[config.STATUS_ACTIVE],
+                    transit_statuses=[config.STATUS_BUILD],
+                    timeout=config.SERVER_ACTIVE_TIMEOUT,
+                    polling=config.SERVER_BUILD_POLLING)
 
-                    self.check_server_status(
-                        server,
-                        expected_statuses=[config.STATUS_ACTIVE],
-                        transit_statuses=[config.STATUS_BUILD],
-                        timeout=config.SERVER_ACTIVE_TIMEOUT)
+                for server in servers_chunk:
+                    server.boot_timings['active'] = (wait_start +
+                                                     elapsed[server.id])
 
             servers.extend(servers_chunk)
 
@@ -189,52 +209,93 @@ class ServerSteps(base.BaseSteps):
         return servers
 
     @steps_checker.step
-    def check_server_presence(self, server, present=True, timeout=0):
+    def check_server_presence(self, server, present=True, timeout=0,
+                              polling=None):
         """Check-step to check server presence.
 
         Args:
-            server (object): nova server
+            server (object|list): nova server or servers
             present (bool): flag to check is server present or absent
             timeout (int): seconds to wait a result of check
+            polling (waiter.Polling, optional): polling policy
 
         Raises:
             TimeoutExpired: if check failed after timeout
         """
+        servers = server if isinstance(server, (list, tuple)) else [server]
+        servers = collections.OrderedDict(
+            (server.id, server) for server in servers)
+        absent = set()
 
-        def predicate():
-            try:
-                server.get()
-                return present
-            except nova_exceptions.NotFound:
-                return not present
+        def _refresh(server_ids):
+            absent.clear()
+            absent.update(self._refresh_servers(
+                [servers[server_id] for server_id in server_ids]))
 
-        waiter.wait(predicate, timeout_seconds=timeout)
+        def predicate(server):
+            return (server.id not in absent) == present
+
+        predicates = collections.OrderedDict(
+            (server.id, functools.partial(predicate, server))
+            for server in servers.values())
+        waiter.wait_all(predicates, timeout_seconds=timeout, polling=polling,
+                        refresh=_refresh)
 
     @steps_checker.step
     def check_server_status(self,
                             server,
                             expected_statuses,
                             transit_statuses=(),
-                            timeout=0):
+                            timeout=0,
+                            polling=None):
         """Verify step to check server status.
 
+        Servers are polled together, so each server is dropped from polling
+        once it leaves transit statuses.
+
         Args:
-            server (object): nova server to check its status
+            server (object|list): nova server or servers to check status
             expected_statuses (list): expected server statuses
             transit_statuses (iterable): allowed transit statuses
             timeout (int): seconds to wait a result of check
+            polling (waiter.Polling, optional): polling policy, for ex:
+                ``config.SERVER_BUILD_POLLING``
+
+        Returns:
+            dict: seconds spent until each server left transit statuses by
+                server id
 
         Raises:
             TimeoutExpired: if check failed after timeout
         """
-        def _check_server_status():
-            server.get()
+        servers = server if isinstance(server, (list, tuple)) else [server]
+        servers = collections.OrderedDict(
+            (server.id, server) for server in servers)
+        absent = set()
+
+        def _refresh(server_ids):
+            absent.clear()
+            absent.update(self._refresh_servers(
+                [servers[server_id] for server_id in server_ids]))
+
+        def _check_server_status(server):
+            if server.id in absent:
+                server.get()  # raise NotFound
             return waiter.expect_that(server.status.lower(),
                                       is_not(is_in(transit_statuses)))
 
-        waiter.wait(_check_server_status, timeout_seconds=timeout)
-        err_msg = self._error_message(server)
-        assert_that(server.status.lower(), is_in(expected_statuses), err_msg)
+        predicates = collections.OrderedDict(
+            (server.id, functools.partial(_check_server_status, server))
+            for server in servers.values())
+        results = waiter.wait_all(predicates, timeout_seconds=timeout,
+                                  polling=polling, refresh=_refresh)
+
+        for server in servers.values():
+            err_msg = self._error_message(server)
+            assert_that(server.status.lower(), is_in(expected_statuses),
+                        err_msg)
+
+        return results.elapsed
 
     @steps_checker.step
     def get_server_credentials(self, server):
@@ -706,29 +767,36 @@ class ServerSteps(base.BaseSteps):
     def check_ping_by_plan(self, ping_plan, timeout=0):
         """Step to check ping using ping plan dict.
 
+        All pings are executed concurrently. Only failed pings are retried
+        until timeout.
+
         Args:
             ping_plan (dict): servers and lists of
                 ips/tuples(server, ip_type)/servers to ping
             timeout (int): seconds to wait for result of check
 
+        Returns:
+            ping.PingMatrix: connectivity matrix of ping plan
+
         Raises:
             TimeoutExpired: if check failed after timeout
         """
         parsed_ping_plan = self._parse_ping_plan(ping_plan)
+        plan = {}
+        for server, ips in parsed_ping_plan.items():
+            floating_ip = self.get_floating_ip(server)
+            server_ssh = self.get_server_ssh(server, ip=floating_ip,
+                                             check=False)
+            plan[server_ssh] = ips
+        matrix = ping.PingMatrix(plan)
 
         def _check_ping_by_plan():
-            for server, ips in parsed_ping_plan.items():
-                floating_ip = self.get_floating_ip(server)
+            failed = matrix.probe()
+            return waiter.expect_that(
+                failed, empty(), 'Pings are failed:\n{}'.format(matrix))
 
-                with self.get_server_ssh(server, ip=floating_ip) as server_ssh:
-                    for ip in ips:
-                        self.check_ping_for_ip(ip, remote_from=server_ssh)
-            return True
-
-        waiter.wait(
-            _check_ping_by_plan,
-            timeout_seconds=timeout,
-            expected_exceptions=waiter.TimeoutExpired)
+        waiter.wait(_check_ping_by_plan, timeout_seconds=timeout)
+        return matrix
 
     def _get_ping_plan_for_servers(self, servers, ip_types):
         """Get dict which contains ip list to ping for all servers"""
@@ -784,12 +852,12 @@ class ServerSteps(base.BaseSteps):
             server.live_migrate(host=host, block_migration=block_migration)
 
         if check:
+            self.check_server_status(
+                servers,
+                expected_statuses=[config.STATUS_ACTIVE],
+                transit_statuses=[config.STATUS_MIGRATING],
+                timeout=config.LIVE_MIGRATE_TIMEOUT)
             for server, old_host in zip(servers, old_hosts):
-                self.check_server_status(
-                    server,
-                    expected_statuses=[config.STATUS_ACTIVE],
-                    transit_statuses=[config.STATUS_MIGRATING],
-                    timeout=config.LIVE_MIGRATE_TIMEOUT)
                 if host is not None:
                     self.check_server_host_attr(server, host)
                 else:
@@ -813,14 +881,13 @@ class ServerSteps(base.BaseSteps):
             server.migrate()
 
         if check:
-            for server in servers:
-
-                self.check_server_status(
-                    server,
-                    expected_statuses=[config.STATUS_VERIFY_RESIZE],
-                    transit_statuses=[config.STATUS_RESIZE],
-                    timeout=config.VERIFY_RESIZE_TIMEOUT)
+            self.check_server_status(
+                servers,
+                expected_statuses=[config.STATUS_VERIFY_RESIZE],
+                transit_statuses=[config.STATUS_RESIZE],
+                timeout=config.VERIFY_RESIZE_TIMEOUT)
 
+            for server in servers:
                 self.check_server_host_attr(
                     server,
                     old_hosts[server.id],
@@ -842,13 +909,11 @@ class ServerSteps(base.BaseSteps):
             server.confirm_resize()
 
         if check:
-            for server in servers:
-
-                self.check_server_status(
-                    server,
-                    expected_statuses=[config.STATUS_ACTIVE],
-                    transit_statuses=[config.STATUS_VERIFY_RESIZE],
-                    timeout=config.SERVER_ACTIVE_TIMEOUT)
+            self.check_server_status(
+                servers,
+                expected_statuses=[config.STATUS_ACTIVE],
+                transit_statuses=[config.STATUS_VERIFY_RESIZE],
+                timeout=config.SERVER_ACTIVE_TIMEOUT)
 
     @steps_checker.step
     def check_server_host_attr(self, server, host_name=None, host_names=None,
@@ -1456,22 +1521,22 @@ class ServerSteps(base.BaseSteps):
             server.delete()
 
         if check:
-            for server in servers:
-                self.check_server_presence(
-                    server,
-                    present=False,
-                    timeout=config.SERVER_DELETE_TIMEOUT)
+            self.check_server_presence(
+                servers,
+                present=False,
+                timeout=config.SERVER_DELETE_TIMEOUT,
+                polling=config.SERVER_DELETE_POLLING)
 
     def _hard_delete_servers(self, servers, check):
         for server in servers:
             server.force_delete()  # delete server really
 
         if check:
-            for server in servers:
-                self.check_server_presence(
-                    server,
-                    present=False,
-                    timeout=config.SERVER_DELETE_TIMEOUT)
+            self.check_server_presence(
+                servers,
+                present=False,
+                timeout=config.SERVER_DELETE_TIMEOUT,
+                polling=config.SERVER_DELETE_POLLING)
 
     @steps_checker.step
     def resize(self, server, flavor, check=True):
@@ -1627,6 +1692,41 @@ class ServerSteps(base.BaseSteps):
         assert_that(result['summary']['error_percent'],
                     less_than_or_equal_to(max_loss))
 
+    def _refresh_servers(self, servers):
+        """Refresh servers data in place.
+
+        Several servers are refreshed with one list request filtered by
+        names. Servers which are absent in list (for ex: servers of other
+        projects) are refreshed one by one.
+
+        Args:
+            servers (list): nova servers
+
+        Returns:
+            set: ids of absent servers
+        """
+        fresh_servers = {}
+        if len(servers) > 1:
+            search_opts = {}
+            if all(server.name for server in servers):
+                search_opts['name'] = '^({})$'.format('|'.join(
+                    re.sub(r'([.^$*+?{}\[\]\\|()])', r'\\\1', server.name)
+                    for server in servers))
+            fresh_servers = {
+                fresh.id: fresh for fresh in self._client.list(
+                    detailed=True, search_opts=search_opts)}
+
+        absent = set()
+        for server in servers:
+            if server.id in fresh_servers:
+                server._add_details(fresh_servers[server.id]._info)
+                continue
+            try:
+                server.get()
+            except nova_exceptions.NotFound:
+                absent.add(server.id)
+        return absent
+
     def _error_message(self, server):
         fault = getattr(server, 'fault', {})
         if not fault:
@@ -1689,16 +1789,15 @@ class ServerSteps(base.BaseSteps):
             server.evacuate(host)
 
         if check:
-            for server in servers:
-
-                self.check_server_status(
-                    server,
-                    expected_statuses=[config.STATUS_ACTIVE],
-                    transit_statuses=[config.STATUS_REBUILD,
-                                      config.STATUS_REBUILDING,
-                                      config.STATUS_REBUILD_SPAWNING],
-                    timeout=config.SERVER_ACTIVE_TIMEOUT)
+            self.check_server_status(
+                servers,
+                expected_statuses=[config.STATUS_ACTIVE],
+                transit_statuses=[config.STATUS_REBUILD,
+                                  config.STATUS_REBUILDING,
+                                  config.STATUS_REBUILD_SPAWNING],
+                timeout=config.SERVER_ACTIVE_TIMEOUT)
 
+            for server in servers:
                 self.check_server_host_attr(
                     server,
                     failed_host[server.id],
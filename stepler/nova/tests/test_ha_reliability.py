@@ -208,6 +208,7 @@ def test_power_off_cluster(cirros_image,
         node = os_faults_steps.get_nodes(fqdns=[fqdn])
         os_faults_steps.poweron_nodes(node)
 
+    get_nova_client.invalidate()
     get_nova_client()
     nova_service_steps.check_services_up(
         timeout=config.NOVA_SERVICES_UP_TIMEOUT)
@@ -297,6 +298,7 @@ def test_network_outage(cirros_image,
 
     time.sleep(config.NETWORK_OUTAGE_TIME)
 
+    get_nova_client.invalidate()
     get_nova_client()
     nova_service_steps.check_services_up(
         timeout=config.NOVA_SERVICES_UP_TIMEOUT)
@@ -508,6 +510,7 @@ def test_graceful_shutdown_cluster(cirros_image,
 
     os_faults_steps.poweron_nodes(controllers)
 
+    get_nova_client.invalidate()
     get_nova_client()
     nova_service_steps.check_services_up(
         host_names=controller_host_names,
@@ -517,6 +520,7 @@ def test_graceful_shutdown_cluster(cirros_image,
 
     os_faults_steps.poweron_nodes(computes)
 
+    get_nova_client.invalidate()
     get_nova_client()
     nova_service_steps.check_services_up(
         timeout=config.NOVA_SERVICES_UP_TIMEOUT)
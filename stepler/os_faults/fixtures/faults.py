@@ -187,6 +187,7 @@ def shutdown_nodes(os_faults_steps, get_nova_client, nova_service_steps):
         nodes_to_start = os_faults_steps.get_nodes(fqdns=fqdns_to_start)
         os_faults_steps.poweron_nodes(nodes_to_start)
         # reinit nova client and wait for its availability
+        get_nova_client.invalidate()
         get_nova_client()
         nova_service_steps.check_services_up(
             timeout=config.NOVA_SERVICES_UP_TIMEOUT)
@@ -37,6 +37,7 @@ from six import moves
 from stepler import base
 from stepler import config
 from stepler.third_party import network_checks
+from stepler.third_party import pcap
 from stepler.third_party import steps_checker
 from stepler.third_party import tcpdump
 from stepler.third_party import utils
@@ -1306,7 +1307,8 @@ class OsFaultsSteps(base.BaseSteps):
         self.execute_cmd(nodes, cmd, check=check)
 
     @steps_checker.step
-    def start_tcpdump(self, nodes, args='', prefix=None, check=True):
+    def start_tcpdump(self, nodes, args='', prefix=None, bpf_filter=None,
+                      file_size=None, file_count=None, check=True):
         """Step to start tcpdump on nodes in backgroud.
 
         Args:
@@ -1314,6 +1316,11 @@ class OsFaultsSteps(base.BaseSteps):
             args (str, optional): additional ``tcpdump`` args
             prefix (str, optional): prefix for command. It can be useful for
                 executing tcpdump on ip namespace.
+            bpf_filter (str, optional): BPF filter to capture matched packets
+                only
+            file_size (int, optional): max size of cap file in megabytes. If
+                passed, packets are captured to ring buffer of files.
+            file_count (int, optional): max count of cap files in ring buffer
             check (bool, optional): flag whether to check this step or not
 
         Returns:
@@ -1324,17 +1331,22 @@ class OsFaultsSteps(base.BaseSteps):
                 failed
         """
         base_path = tempfile.mktemp()
-        cmd = ("( ( nohup {prefix} tcpdump -w{base_path}.cap {args} "
+        tcpdump_cmd = tcpdump.get_tcpdump_cmd(
+            base_path + '.cap', args=args, prefix=prefix,
+            bpf_filter=bpf_filter, file_size=file_size, file_count=file_count)
+        cmd = ("( ( nohup {tcpdump_cmd} "
                "<&- >{base_path}.stdout 2>{base_path}.stderr ) & "
                "echo $! > {base_path}.pid )").format(
-                   args=args, base_path=base_path, prefix=prefix or '')
+                   tcpdump_cmd=tcpdump_cmd, base_path=base_path)
         self.execute_cmd(nodes, cmd, check=check)
         if check:
             # Check that commands is running
             cmd = "ps -eo pid | grep $(cat {}.pid)".format(base_path)
             self.execute_cmd(nodes, cmd)
-            # Check that pcap file is appear
-            cmd = 'while [ ! -f {}.cap ]; do sleep 1; done'.format(base_path)
+            # Check that pcap file is appear. Ring buffer files have numeric
+            # suffixes.
+            cmd = ('while ! ls {}.cap* > /dev/null 2>&1; '
+                   'do sleep 1; done').format(base_path)
             self.execute_cmd(nodes, cmd)
             # tcpdump need some more time to start packets capturing
             time.sleep(config.TCPDUMP_LATENCY)
@@ -1367,13 +1379,18 @@ class OsFaultsSteps(base.BaseSteps):
                'do sleep 1; done;').format(base_path)
 
     @steps_checker.step
-    def download_tcpdump_results(self, nodes, base_path, check=True):
+    def download_tcpdump_results(self, nodes, base_path, bpf_filter=None,
+                                 check=True):
         """Step to copy tcpdump cap files to local server.
 
+        Ring buffer files are merged to one cap file on nodes before copying.
+
         Args:
             nodes (NodeCollection): nodes to start tcpdump
             base_path (str): base path for cap, pid, stdout, stderr files for
                 tcpdump
+            bpf_filter (str, optional): BPF filter to copy matched packets
+                only. Packets are filtered on nodes.
             check (bool, optional): flag whether to check this step or not
 
         Returns:
@@ -1384,10 +1401,21 @@ class OsFaultsSteps(base.BaseSteps):
             AssertionError|AnsibleExecutionException: if command execution
                 failed
         """
+        cap_path = base_path + '.cap'
+        merged_path = base_path + '.merged'
+        cmd = tcpdump.get_merge_cmd(cap_path, merged_path,
+                                    bpf_filter=bpf_filter)
+        if not bpf_filter:
+            # there is nothing to merge without ring buffer
+            cmd = ("if ls {cap_path}?* > /dev/null 2>&1; then {cmd}; "
+                   "else mv {cap_path} {merged_path}; fi").format(
+                       cap_path=cap_path, merged_path=merged_path, cmd=cmd)
+        self.execute_cmd(nodes, cmd, check=check)
+
         dest_dir = tempfile.mkdtemp()
         task = {
             'fetch': {
-                'src': base_path + '.cap',
+                'src': merged_path,
                 'dest': dest_dir,
             }
         }
@@ -1400,7 +1428,7 @@ class OsFaultsSteps(base.BaseSteps):
         cap_files = {}
         for node in nodes:
             path = os.path.join(dest_dir, node.ip)
-            cap_files[node.fqdn] = path + base_path + '.cap'
+            cap_files[node.fqdn] = path + merged_path
 
         if check:
             for path in cap_files.values():
@@ -1411,6 +1439,44 @@ class OsFaultsSteps(base.BaseSteps):
 
         return cap_files
 
+    @steps_checker.step
+    def get_tcpdump_summary(self, nodes, base_path, check=True):
+        """Step to get summaries of captured packets flows.
+
+        Cap files are summarized on nodes, so only summaries are copied to
+        local server. tcpdump results are removed from nodes after that.
+
+        Args:
+            nodes (NodeCollection): nodes to summarize tcpdump results on
+            base_path (str): base path for cap, pid, stdout, stderr files for
+                tcpdump
+            check (bool, optional): flag whether to check this step or not
+
+        Returns:
+            dict: node fqdn -> list of pcap.FlowSummary
+
+        Raises:
+            AssertionError|AnsibleExecutionException: if command execution
+                failed
+        """
+        cmd = tcpdump.get_summary_cmd(base_path + '.cap')
+        result = self.execute_cmd(nodes, cmd, check=check)
+
+        # Clear tcpdump results on nodes
+        cmd = "rm -f {}*".format(base_path)
+        self.execute_cmd(nodes, cmd)
+
+        summaries = {}
+        for node_result in result:
+            for node in nodes:
+                if node.ip == node_result.host:
+                    summaries[node.fqdn] = pcap.load_summary(
+                        node_result.payload['stdout'] or '[]')
+                    break
+        if check:
+            assert_that(summaries, has_length(len(nodes)))
+        return summaries
+
     @steps_checker.step
     def check_last_pings_replies_timestamp(self, file1, matcher, file2):
         """Compare last ICMP echo response timestamp from 2 files.
@@ -1491,12 +1557,10 @@ class OsFaultsSteps(base.BaseSteps):
             AssertionError: if check failed
         """
         filters = add_filters or []
-        filters.append(tcpdump.filter_vxlan)
-        lfilter = lambda x: all(filter_(x) for filter_ in filters)
         vnis = set()
-        for packet in tcpdump.read_pcap(
-                pcap_path, lfilter=lfilter):
-            vnis.add(packet.getlayer('VXLAN').vni)
+        for packet in tcpdump.get_pcap_index(pcap_path).query(proto='vxlan'):
+            if all(filter_(packet) for filter_ in filters):
+                vnis.add(packet.vni)
 
         assert_that(vnis, only_contains(network['provider:segmentation_id']))
 
@@ -1513,11 +1577,8 @@ class OsFaultsSteps(base.BaseSteps):
         Raises:
             AssertionError: if check failed
         """
-        def lfilter(packet):
-            return (packet.haslayer('ARP') and
-                    packet.getlayer('ARP').psrc == psrc)
-
-        packets = list(tcpdump.read_pcap(pcap_path, lfilter))
+        packets = tcpdump.get_pcap_index(pcap_path).query(proto='arp',
+                                                          src=psrc)
         matcher = is_not(empty()) if must_present else is_(empty())
         assert_that(packets, matcher)
 
@@ -1532,13 +1593,8 @@ class OsFaultsSteps(base.BaseSteps):
         Raises:
             AssertionError: if check failed
         """
-        def lfilter(packet):
-            vxlan = packet.getlayer('VXLAN')
-            if vxlan is None:
-                return False
-            return vxlan.haslayer('ICMP') and vxlan.getlayer('IP').src == src
-
-        packets = list(tcpdump.read_pcap(pcap_path, lfilter))
+        packets = tcpdump.get_pcap_index(pcap_path).query(
+            proto='vxlan', inner={'proto': 'icmp', 'src': src})
         assert_that(packets, is_not(empty()))
 
     @steps_checker.step
@@ -19,7 +19,8 @@ Arpings checking helpers
 
 import contextlib
 import re
-import tempfile
+
+from stepler.third_party import ssh
 
 
 @contextlib.contextmanager
@@ -46,19 +47,16 @@ def arping(ip, iface, remote, count=None, latency=2):
     else:
         cmd = "arping -I {iface} {ip}"
     cmd = cmd.format(iface=iface, ip=ip, count=count)
-    output_file = tempfile.mktemp()
-    with remote.sudo():
-        pid = remote.background_call(cmd, stdout=output_file)
     result = {}
-    yield result
-    with remote.sudo():
-        if not count:
-            remote.execute('kill -SIGINT {}'.format(pid))
-        remote.wait_process_done(pid, timeout=latency)
-        stdout = remote.check_call("cat {}".format(output_file)).stdout
-        remote.execute('rm {}'.format(output_file))
+    with ssh.RemoteJob(remote, cmd, sudo=True) as job:
+        yield result
+        if count:
+            job.wait(timeout=latency)
+        else:
+            job.stop('INT', timeout=latency)
     search_result = re.search(
-        r"Sent (?P<sent>\d+).+?Received (?P<received>\d+)", stdout, re.DOTALL)
+        r"Sent (?P<sent>\d+).+?Received (?P<received>\d+)",
+        job.result.stdout, re.DOTALL)
     if search_result is not None:
         for key, value in search_result.groupdict().items():
             result[key] = int(value)
@@ -0,0 +1,121 @@
+"""
+-----
+Cache
+-----
+
+Keyed cache of expensive objects (keystone sessions, service clients, etc).
+
+All created caches are registered globally, so they can be invalidated at
+once, for ex: after cloud revert.
+"""
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+import weakref
+
+__all__ = [
+    'Cache',
+    'invalidate_all',
+]
+
+LOGGER = logging.getLogger(__name__)
+
+_caches = weakref.WeakSet()
+
+
+class Cache(object):
+    """Thread-safe keyed cache.
+
+    Example:
+        >>> sessions = Cache('sessions')
+        >>> session = sessions.get(('admin', 'admin'), create_session)
+        >>> sessions.invalidate()
+    """
+
+    def __init__(self, name=None):
+        """Constructor.
+
+        Args:
+            name (str, optional): cache name for logging
+        """
+        self.name = name or 'cache'
+        self.hits = 0
+        self.misses = 0
+        self._items = {}
+        self._lock = threading.RLock()
+        _caches.add(self)
+
+    def __repr__(self):
+        """Representation."""
+        return "Cache <name={!r} size={} hits={} misses={}>".format(
+            self.name, len(self), self.hits, self.misses)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, factory, *args, **kwgs):
+        """Get cached value or create it with factory.
+
+        Args:
+            key (hashable): cache key
+            factory (function): function to create value if it's absent
+            *args: factory args
+            **kwgs: factory kwgs
+
+        Returns:
+            object: cached or just created value
+        """
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                return self._items[key]
+
+            self.misses += 1
+            value = self._items[key] = factory(*args, **kwgs)
+            return value
+
+    def set(self, key, value):
+        """Put value to cache.
+
+        Args:
+            key (hashable): cache key
+            value (object): value to cache
+        """
+        with self._lock:
+            self._items[key] = value
+
+    def invalidate(self, key=None):
+        """Invalidate cached value.
+
+        Args:
+            key (hashable, optional): cache key to invalidate. By default all
+                cached values are invalidated.
+        """
+        with self._lock:
+            if key is None:
+                LOGGER.debug('Invalidate {!r}'.format(self))
+                self._items.clear()
+            else:
+                self._items.pop(key, None)
+
+
+def invalidate_all():
+    """Invalidate all created caches."""
+    for cache in list(_caches):
+        cache.invalidate()
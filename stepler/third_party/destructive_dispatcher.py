@@ -29,6 +29,8 @@ import pytest
 import six
 
 from stepler import config
+from stepler.third_party import cache
+from stepler.third_party import ssh
 from stepler.third_party import waiter
 
 __all__ = [
@@ -136,6 +138,10 @@ def pytest_runtest_teardown(item, nextitem):
 
     if do_revert and destructor:
         revert_environment(destructor, snapshot_name)
+        # Cached sessions, clients and SSH connections are invalid for
+        # reverted cloud
+        cache.invalidate_all()
+        ssh.pool.clear()
         time.sleep(item.session.config.option.revert_timeout * 60)
 
 
@@ -19,7 +19,8 @@ Iperf checking helpers
 
 import contextlib
 import csv
-import tempfile
+
+from stepler.third_party import ssh
 
 
 def _transform_values(values_dict, fields, transform):
@@ -92,19 +93,15 @@ def iperf(remote, ip, time=80, interval=20, port=5002, udp=False):
     else:
         cmd = 'iperf -c {ip} -p {port} -y C -t {time} -i {interval}'
     cmd = cmd.format(ip=ip, port=port, time=time, interval=interval)
-    stdout_path = tempfile.mktemp()
-    stderr_path = tempfile.mktemp()
-    pid = remote.background_call(cmd, stdout=stdout_path, stderr=stderr_path)
     result = {}
 
-    yield result
-
-    remote.wait_process_done(pid, timeout=time + 10)
+    with ssh.RemoteJob(remote, cmd) as job:
+        yield result
+        job.wait(timeout=time + 10)
 
     # Check stderr is empty
-    stderr = remote.check_call('cat {path}'.format(path=stderr_path)).stdout
-    if stderr:
-        raise Exception('iperf stderr is not empty:\n{}'.format(stderr))
+    if job.result.stderr:
+        raise Exception('iperf stderr is not empty:\n{}'.format(
+            job.result.stderr))
 
-    stdout = remote.check_call('cat {path}'.format(path=stdout_path)).stdout
-    result.update(_parse(stdout))
+    result.update(_parse(job.result.stdout))
@@ -0,0 +1,275 @@
+"""
+-----------------
+pcap files parser
+-----------------
+
+Fast parser of pcap packets headers and flows summarizer.
+
+Module uses only python standard library and is compatible with python 2 and
+3, so its source can be executed on nodes to summarize capture files there
+and transfer only compact summaries::
+
+    python -c "<module source>" /tmp/capture.pcap0 /tmp/capture.pcap1
+"""
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import itertools
+import json
+import socket
+import struct
+import sys
+
+__all__ = [
+    'FlowSummary',
+    'PacketInfo',
+    'dump_summary',
+    'is_supported',
+    'load_summary',
+    'read_packet_infos',
+    'summarize',
+]
+
+# byte order and timestamp fraction unit by pcap magic
+PCAP_MAGICS = {
+    b'\xa1\xb2\xc3\xd4': ('>', 0.000001),
+    b'\xd4\xc3\xb2\xa1': ('<', 0.000001),
+    b'\xa1\xb2\x3c\x4d': ('>', 0.000000001),
+    b'\x4d\x3c\xb2\xa1': ('<', 0.000000001),
+}
+PCAP_HEADER_SIZE = 24
+LINKTYPE_ETHERNET = 1
+LINKTYPE_LINUX_SLL = 113
+ETHER_TYPE_IP = 0x0800
+ETHER_TYPE_ARP = 0x0806
+ETHER_TYPES_VLAN = (0x8100, 0x88a8)
+IP_PROTOS = {1: 'icmp', 6: 'tcp', 17: 'udp'}
+VXLAN_PORTS = (4789, 8472)
+
+# Packet headers summary. ``proto`` is one of 'arp', 'icmp', 'tcp', 'udp',
+# 'vxlan', number of other IP protocol or hex ether type of non-IP packet.
+# ``src`` and ``dst`` are IP addresses (sender and target addresses for ARP).
+# ``inner`` is summary of packet encapsulated to VxLAN.
+PacketInfo = collections.namedtuple(
+    'PacketInfo', ['time', 'proto', 'src', 'dst', 'sport', 'dport',
+                   'icmp_type', 'icmp_id', 'vni', 'inner'])
+PacketInfo.__new__.__defaults__ = (None,) * len(PacketInfo._fields)
+
+# Packets fields which identify flow.
+FLOW_FIELDS = ('proto', 'src', 'dst', 'sport', 'dport', 'icmp_type', 'vni')
+
+# Summary of packets flow. ``inner`` is PacketInfo with flow fields of
+# encapsulated packets. ``first`` and ``last`` are timestamps of first and
+# last flow packets.
+FlowSummary = collections.namedtuple(
+    'FlowSummary', FLOW_FIELDS + ('inner', 'count', 'first', 'last'))
+
+
+def _parse_ether_payload(data, offset, ether_type, fields):
+    while ether_type in ETHER_TYPES_VLAN:
+        ether_type, = struct.unpack_from('!H', data, offset + 2)
+        offset += 4
+
+    if ether_type == ETHER_TYPE_ARP:
+        fields['proto'] = 'arp'
+        fields['src'] = socket.inet_ntoa(bytes(data[offset + 14:offset + 18]))
+        fields['dst'] = socket.inet_ntoa(bytes(data[offset + 24:offset + 28]))
+        return
+    if ether_type != ETHER_TYPE_IP:
+        fields['proto'] = '0x{:04x}'.format(ether_type)
+        return
+
+    header_size = (data[offset] & 0x0f) * 4
+    protocol = data[offset + 9]
+    fields['proto'] = IP_PROTOS.get(protocol, str(protocol))
+    fields['src'] = socket.inet_ntoa(bytes(data[offset + 12:offset + 16]))
+    fields['dst'] = socket.inet_ntoa(bytes(data[offset + 16:offset + 20]))
+    fragment_offset, = struct.unpack_from('!H', data, offset + 6)
+    if fragment_offset & 0x1fff:
+        # transport header is in first fragment only
+        return
+
+    offset += header_size
+    if fields['proto'] == 'icmp':
+        fields['icmp_type'] = data[offset]
+        fields['icmp_id'], = struct.unpack_from('!H', data, offset + 4)
+    elif fields['proto'] in ('tcp', 'udp'):
+        fields['sport'], fields['dport'] = struct.unpack_from('!HH', data,
+                                                              offset)
+        if fields['proto'] == 'udp' and fields['dport'] in VXLAN_PORTS:
+            fields['proto'] = 'vxlan'
+            vni, = struct.unpack_from('!I', data, offset + 12)
+            fields['vni'] = vni >> 8
+            fields['inner'] = _parse_frame(data, offset + 16,
+                                           LINKTYPE_ETHERNET, fields['time'])
+
+
+def _parse_frame(data, offset, linktype, timestamp):
+    """Parse headers of link layer frame to PacketInfo.
+
+    Truncated frame is parsed as much as possible.
+    """
+    fields = dict(time=timestamp)
+    try:
+        if linktype == LINKTYPE_LINUX_SLL:
+            ether_type, = struct.unpack_from('!H', data, offset + 14)
+            offset += 16
+        else:
+            ether_type, = struct.unpack_from('!H', data, offset + 12)
+            offset += 14
+        _parse_ether_payload(data, offset, ether_type, fields)
+    except (struct.error, IndexError):
+        pass
+    return PacketInfo(**fields)
+
+
+def _read_header(f):
+    """Read pcap file header.
+
+    Returns byte order, timestamp fraction unit and link type, or None if file
+    format or link type isn't supported.
+    """
+    header = f.read(PCAP_HEADER_SIZE)
+    byte_order, time_unit = PCAP_MAGICS.get(header[:4], (None, None))
+    if byte_order is None or len(header) < PCAP_HEADER_SIZE:
+        return None
+    linktype, = struct.unpack(byte_order + 'I', header[20:24])
+    if linktype not in (LINKTYPE_ETHERNET, LINKTYPE_LINUX_SLL):
+        return None
+    return byte_order, time_unit, linktype
+
+
+def is_supported(path):
+    """Check that pcap file format and link type are supported by parser.
+
+    Args:
+        path (str): path to pcap file
+
+    Returns:
+        bool: whether file can be read with ``read_packet_infos``
+    """
+    with open(path, 'rb') as f:
+        return _read_header(f) is not None
+
+
+def read_packet_infos(path):
+    """Read pcap file and yields packets summaries.
+
+    File is read by one pass.
+
+    Args:
+        path (str): path to pcap file
+
+    Yields:
+        PacketInfo: packet headers summary
+
+    Raises:
+        ValueError: if file format or link type isn't supported
+    """
+    with open(path, 'rb') as f:
+        header = _read_header(f)
+        if header is None:
+            raise ValueError(
+                "{!r} format or link type isn't supported".format(path))
+        byte_order, time_unit, linktype = header
+
+        record_header = struct.Struct(byte_order + 'IIII')
+        while True:
+            record = f.read(record_header.size)
+            if len(record) < record_header.size:
+                return
+            sec, fraction, size, _ = record_header.unpack(record)
+            data = bytearray(f.read(size))
+            yield _parse_frame(data, 0, linktype, sec + time_unit * fraction)
+
+
+def _flow_key(info):
+    return tuple(getattr(info, field) for field in FLOW_FIELDS)
+
+
+def summarize(infos):
+    """Summarize packets by flows.
+
+    Flow is identified by protocol, addresses, ports, ICMP type and VNI of
+    packet and the same fields of encapsulated packet.
+
+    Args:
+        infos (iterable): PacketInfo records
+
+    Returns:
+        list: FlowSummary records in order of flows appearance
+    """
+    flows = collections.OrderedDict()
+    for info in infos:
+        inner = None
+        if info.inner is not None:
+            inner = PacketInfo(**dict(zip(FLOW_FIELDS,
+                                          _flow_key(info.inner))))
+        key = _flow_key(info) + (inner,)
+        stats = flows.get(key)
+        if stats is None:
+            flows[key] = [1, info.time, info.time]
+        else:
+            stats[0] += 1
+            stats[1] = min(stats[1], info.time)
+            stats[2] = max(stats[2], info.time)
+
+    return [FlowSummary(*(flow_key + tuple(flow_stats)))
+            for flow_key, flow_stats in flows.items()]
+
+
+def dump_summary(flows):
+    """Serialize flows summaries to JSON.
+
+    Args:
+        flows (list): FlowSummary records
+
+    Returns:
+        str: JSON
+    """
+    return json.dumps(flows, separators=(',', ':'))
+
+
+def load_summary(data):
+    """Deserialize flows summaries from JSON.
+
+    Args:
+        data (str): JSON produced by ``dump_summary``
+
+    Returns:
+        list: FlowSummary records
+    """
+    flows = []
+    for values in json.loads(data):
+        flow = FlowSummary(*values)
+        if flow.inner is not None:
+            flow = flow._replace(inner=PacketInfo(*flow.inner))
+        flows.append(flow)
+    return flows
+
+
+def main(paths):
+    """Print JSON summary of flows of pcap files.
+
+    Args:
+        paths (list): paths to pcap files in capture order
+    """
+    infos = itertools.chain.from_iterable(read_packet_infos(path)
+                                          for path in paths)
+    sys.stdout.write(dump_summary(summarize(infos)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
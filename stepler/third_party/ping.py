@@ -17,15 +17,24 @@ Pings checking helpers
 # See the License for the specific language governing permissions and
 # limitations under the License.from functools import wraps
 
+import collections
 import contextlib
+import errno
+import math
 import os
 import re
+import select
 import signal
+import socket
+import struct
 import sys
-import tempfile
+import threading
+import time
 
 import six
-import waiting
+
+from stepler.third_party import ssh
+from stepler.third_party import utils
 
 if os.name == 'posix' and sys.version_info[0] < 3:
     import subprocess32 as subprocess
@@ -33,38 +42,146 @@ else:
     import subprocess
 
 
+PingStats = collections.namedtuple(
+    'PingStats', ['transmitted', 'received', 'rtts', 'rtt_min', 'rtt_avg',
+                  'rtt_max', 'rtt_mdev', 'gaps'])
+
+# sequence numbers of lost replies and duration of outage in seconds
+Gap = collections.namedtuple('Gap', ['first_seq', 'last_seq', 'duration'])
+
+
 class PingResult(object):
     """Ping result class.
 
     Useful for object-oriented access to results of ping (such as transmitted,
-    received, loss counts)
+    received, loss counts, round trip times and gaps of lost replies).
+    Output is parsed once to ``PingStats`` record after it's set.
     """
-    _transmitted_count_re = r'(?P<count>\d+)(?: packets transmitted)'
-    _received_count_re = r'(?P<count>\d+)(?:( packets)? received)'
+    _transmitted_count_re = re.compile(
+        r'(?P<count>\d+)(?: packets transmitted)')
+    _received_count_re = re.compile(
+        r'(?P<count>\d+)(?:( packets)? received)')
+    _reply_re = re.compile(r'^(?:\[(?P<timestamp>[\d.]+)\] )?\d+ bytes from '
+                           r'.*?(?P<icmp>icmp_)?seq=(?P<seq>\d+) '
+                           r'.*?time=(?P<rtt>[\d.]+) ms', re.MULTILINE)
+    _summary_re = re.compile(
+        r'(?:rtt|round-trip) min/avg/max(?:/mdev)? = (?P<values>[\d./]+) ms')
+
+    def __init__(self, interval=1):
+        """Constructor.
 
-    def __init__(self):
+        Args:
+            interval (float, optional): ping interval in seconds to calculate
+                duration of gaps if ping output has no timestamps
+        """
+        self.interval = interval
         self._stdout = ''
+        self._stats = None
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = self._parse(self._stdout)
+        return self._stats
+
+    def _parse(self, stdout):
+        transmitted = self._transmitted_count_re.search(stdout)
+        if transmitted is not None:
+            transmitted = int(transmitted.group('count'))
+        received = self._received_count_re.search(stdout)
+        if received is not None:
+            received = int(received.group('count'))
+
+        replies = collections.OrderedDict()
+        first_seq = 0
+        for match in self._reply_re.finditer(stdout):
+            # iputils ping numerates requests from 1, busybox ping - from 0
+            first_seq = 1 if match.group('icmp') else 0
+            timestamp = match.group('timestamp')
+            replies.setdefault(int(match.group('seq')), (
+                float(match.group('rtt')),
+                float(timestamp) if timestamp else None))
+        rtts = [rtt for rtt, _ in replies.values()]
+
+        summary = self._summary_re.search(stdout)
+        if summary is not None:
+            values = [float(value)
+                      for value in summary.group('values').split('/')]
+            rtt_min, rtt_avg, rtt_max = values[:3]
+            rtt_mdev = values[3] if len(values) > 3 else None
+        elif rtts:
+            rtt_min, rtt_avg, rtt_max = (min(rtts), sum(rtts) / len(rtts),
+                                         max(rtts))
+            rtt_mdev = None
+        else:
+            rtt_min = rtt_avg = rtt_max = rtt_mdev = None
+        if rtt_mdev is None and rtts:
+            rtt_mdev = math.sqrt(
+                max(sum(rtt ** 2 for rtt in rtts) / len(rtts) -
+                    (sum(rtts) / len(rtts)) ** 2, 0))
+
+        gaps = self._get_gaps(replies, first_seq, transmitted)
+        return PingStats(transmitted, received, rtts, rtt_min, rtt_avg,
+                         rtt_max, rtt_mdev, gaps)
+
+    def _get_gaps(self, replies, first_seq, transmitted):
+        seqs = sorted(replies)
+        last_seq = first_seq + transmitted - 1 if transmitted else None
+        if not seqs:
+            if last_seq is None:
+                return []
+            return [Gap(first_seq, last_seq,
+                        transmitted * self.interval)]
+
+        gaps = []
+        if seqs[0] > first_seq:
+            gaps.append(Gap(first_seq, seqs[0] - 1,
+                            (seqs[0] - first_seq) * self.interval))
+        for prev_seq, next_seq in zip(seqs, seqs[1:]):
+            if next_seq - prev_seq < 2:
+                continue
+            prev_ts, next_ts = replies[prev_seq][1], replies[next_seq][1]
+            if prev_ts is not None and next_ts is not None:
+                duration = next_ts - prev_ts - self.interval
+            else:
+                duration = (next_seq - prev_seq - 1) * self.interval
+            gaps.append(Gap(prev_seq + 1, next_seq - 1, duration))
+        if last_seq is not None and last_seq > seqs[-1]:
+            gaps.append(Gap(seqs[-1] + 1, last_seq,
+                            (last_seq - seqs[-1]) * self.interval))
+        return gaps
 
     @property
     def transmitted(self):
-        result = re.search(self._transmitted_count_re, self.stdout)
-        if result is None:
+        if self.stats.transmitted is None:
             raise ValueError('There is no transmitted count in `{}`'.format(
                 self.stdout))
-        return int(result.group('count'))
+        return self.stats.transmitted
 
     @property
     def received(self):
-        result = re.search(self._received_count_re, self.stdout)
-        if result is None:
+        if self.stats.received is None:
             raise ValueError('There is no received count in `{}`'.format(
                 self.stdout))
-        return int(result.group('count'))
+        return self.stats.received
 
     @property
     def loss(self):
         return self.transmitted - self.received
 
+    @property
+    def rtts(self):
+        return self.stats.rtts
+
+    @property
+    def gaps(self):
+        return self.stats.gaps
+
+    @property
+    def max_gap(self):
+        """Duration of longest outage in seconds."""
+        return max([gap.duration for gap in self.gaps] or [0])
+
     @property
     def stdout(self):
         return self._stdout
@@ -74,6 +191,7 @@ class PingResult(object):
         if isinstance(value, six.binary_type):
             value = value.decode('utf-8')
         self._stdout = value
+        self._stats = None
 
 
 class Pinger(object):
@@ -118,23 +236,33 @@ class Pinger(object):
     @contextlib.contextmanager
     def _remote_ping(self, count):
         cmd = ' '.join(self._prepare_cmd(count))
-        output_file = tempfile.mktemp()
-        pid = self.remote.background_call(cmd, stdout=output_file)
         result = PingResult()
-        yield result
-        if count:
-            waiting.wait(
-                lambda: not self.remote.execute('ps -o pid | grep {}'.format(
-                    pid)).is_ok,
-                timeout_seconds=count * 10)
-        self.remote.execute('kill -SIGINT {}'.format(pid))
-        result.stdout = self.remote.check_call("cat {}".format(
-            output_file)).stdout
-        self.remote.execute('rm {}'.format(output_file))
+        with ssh.RemoteJob(self.remote, cmd) as job:
+            yield result
+            if count:
+                job.wait(timeout=count * 10)
+        result.stdout = job.result.stdout_bytes
 
-    # TODO(schipiga): seems, refactoring is required
     @contextlib.contextmanager
     def _local_ping(self, count):
+        if not icmp_permitted():
+            with self._local_ping_process(count) as result:
+                yield result
+            return
+
+        pinger = MultiPinger([self.ip_to_ping])
+        stats = pinger.start(count)
+        try:
+            yield stats[self.ip_to_ping]
+        finally:
+            if count:
+                pinger.wait()
+            else:
+                pinger.stop()
+
+    # TODO(schipiga): seems, refactoring is required
+    @contextlib.contextmanager
+    def _local_ping_process(self, count):
         cmd = self._prepare_cmd(count)
         p = subprocess.Popen(cmd,
                              stdout=subprocess.PIPE,
@@ -161,7 +289,8 @@ class Pinger(object):
         Args:
             count (int): count of pings to send
         Returns:
-            object: instance of PingResult
+            object: instance of PingResult or TargetStats (if ping is executed
+                from local host with ICMP socket)
         """
         with self.executor(count=count) as result:
             return result
@@ -195,3 +324,417 @@ class FixedIDPinger(Pinger):
 
     def _prepare_cmd(self, count=None):
         return [self.command_path, self.ip_to_ping, self.icmp_id]
+
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP_PAYLOAD_SIZE = 56
+
+
+def _checksum(data):
+    data = bytearray(data)
+    if len(data) % 2:
+        data.append(0)
+    total = sum(data[i] << 8 | data[i + 1] for i in range(0, len(data), 2))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+def _open_icmp_socket():
+    """Open unprivileged ICMP socket or raw socket if it's permitted.
+
+    Returns:
+        socket.socket|None: ICMP socket or None if it's not permitted
+    """
+    protocol = socket.getprotobyname('icmp')
+    for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            return socket.socket(socket.AF_INET, sock_type, protocol)
+        except socket.error:
+            continue
+    return None
+
+
+def icmp_permitted():
+    """Check whether ICMP socket can be opened by current process."""
+    sock = _open_icmp_socket()
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+
+class TargetStats(object):
+    """Ping statistics of one target.
+
+    It has the same counters as ``PingResult`` and round trip times of
+    received replies in milliseconds.
+    """
+
+    def __init__(self, ip):
+        self.ip = ip
+        self.transmitted = 0
+        self.received = 0
+        self.rtts = []
+
+    def __repr__(self):
+        return ('TargetStats <ip={0.ip!r} transmitted={0.transmitted} '
+                'received={0.received}>'.format(self))
+
+    @property
+    def loss(self):
+        return self.transmitted - self.received
+
+    @property
+    def min_rtt(self):
+        return min(self.rtts) if self.rtts else None
+
+    @property
+    def avg_rtt(self):
+        return sum(self.rtts) / len(self.rtts) if self.rtts else None
+
+    @property
+    def max_rtt(self):
+        return max(self.rtts) if self.rtts else None
+
+
+class MultiPinger(object):
+    """Pinger of many ips from one local process.
+
+    ICMP echo requests are sent with unprivileged ICMP socket or with raw
+    socket. If none of them is permitted, TCP connect probes are sent (refused
+    connection means that target is reachable too). Requests are sent to all
+    targets each ``interval`` and replies are received with ``select``.
+
+    Can be used directly (as MultiPinger.ping) and as non-blocking context
+    manager to ping continuously.
+
+    Example:
+        >>> stats = MultiPinger(['10.0.0.1', '10.0.0.2']).ping(count=3)
+        >>> stats['10.0.0.1'].loss
+        0
+
+        >>> with MultiPinger(['10.0.0.1']) as stats:
+        ...     some_action()
+        >>> print(stats['10.0.0.1'].loss, stats['10.0.0.1'].avg_rtt)
+    """
+
+    def __init__(self, ips, interval=1, timeout=2, mode=None, tcp_port=22):
+        """Constructor.
+
+        Args:
+            ips (list): ips to ping
+            interval (float, optional): seconds between requests to target
+            timeout (float, optional): seconds to wait for reply, after that
+                request is considered as lost
+            mode (str, optional): ``icmp`` or ``tcp`` probes. By default ICMP
+                is used if it's permitted.
+            tcp_port (int, optional): port for TCP connect probes
+        """
+        self.stats = collections.OrderedDict(
+            (ip, TargetStats(ip)) for ip in ips)
+        self.interval = interval
+        self.timeout = timeout
+        self.tcp_port = tcp_port
+        self._sock = None
+        if mode != 'tcp':
+            self._sock = _open_icmp_socket()
+            if self._sock is None and mode == 'icmp':
+                raise RuntimeError('ICMP socket is not permitted')
+        self.mode = 'icmp' if self._sock is not None else 'tcp'
+        self._ident = os.getpid() & 0xffff
+        # send time by (ip, seq) of requests waiting for reply
+        self._requests = {}
+        # (ip, seq) by socket of TCP probes
+        self._probes = {}
+        self._lock = threading.Lock()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        self._stopped = False
+        self._thread = None
+
+    def close(self):
+        """Close sockets."""
+        for sock in self._probes:
+            sock.close()
+        self._probes.clear()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)
+
+    def _send(self, seq):
+        for ip, stats in self.stats.items():
+            sent = time.time()
+            with self._lock:
+                stats.transmitted += 1
+            if self.mode == 'icmp':
+                self._send_icmp(ip, seq, sent)
+            else:
+                self._send_tcp(ip, seq, sent)
+
+    def _send_icmp(self, ip, seq, sent):
+        payload = struct.pack('!d', sent).ljust(ICMP_PAYLOAD_SIZE, b'\0')
+        header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, self._ident,
+                             seq)
+        checksum = _checksum(header + payload)
+        header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum,
+                             self._ident, seq)
+        self._requests[ip, seq] = sent
+        try:
+            self._sock.sendto(header + payload, (ip, 0))
+        except socket.error:
+            # for ex: network is unreachable, request is lost
+            pass
+
+    def _send_tcp(self, ip, seq, sent):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        self._requests[ip, seq] = sent
+        error = sock.connect_ex((ip, self.tcp_port))
+        if error == errno.EINPROGRESS:
+            self._probes[sock] = (ip, seq)
+            return
+        sock.close()
+        if error in (0, errno.ECONNREFUSED):
+            self._reply(ip, seq)
+
+    def _reply(self, ip, seq):
+        sent = self._requests.pop((ip, seq), None)
+        if sent is None:
+            # reply is duplicated or too late
+            return
+        with self._lock:
+            stats = self.stats[ip]
+            stats.received += 1
+            stats.rtts.append((time.time() - sent) * 1000)
+
+    def _receive_icmp(self):
+        data, (ip, _) = self._sock.recvfrom(2048)
+        data = bytearray(data)
+        if self._sock.type == socket.SOCK_RAW:
+            # skip IP header
+            data = data[(data[0] & 0x0f) * 4:]
+        icmp_type, _, _, ident, seq = struct.unpack('!BBHHH',
+                                                    bytes(data[:8]))
+        if icmp_type != ICMP_ECHO_REPLY:
+            return
+        # kernel sets own id for unprivileged ICMP socket and filters replies
+        if self._sock.type == socket.SOCK_RAW and ident != self._ident:
+            return
+        self._reply(ip, seq)
+
+    def _receive_tcp(self, sock):
+        ip, seq = self._probes.pop(sock)
+        error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        sock.close()
+        if error in (0, errno.ECONNREFUSED):
+            self._reply(ip, seq)
+
+    def _expire(self):
+        now = time.time()
+        for key, sent in list(self._requests.items()):
+            if now - sent >= self.timeout:
+                del self._requests[key]
+        for sock, key in list(self._probes.items()):
+            if key not in self._requests:
+                del self._probes[sock]
+                sock.close()
+
+    def _receive(self, deadline):
+        rlist = [self._wakeup_r]
+        if self._sock is not None:
+            rlist.append(self._sock)
+        wlist = list(self._probes)
+        if self._requests:
+            oldest = min(self._requests.values())
+            deadline = min(deadline, oldest + self.timeout)
+        rlist, wlist, _ = select.select(rlist, wlist, [],
+                                        max(deadline - time.time(), 0))
+        if self._wakeup_r in rlist:
+            os.read(self._wakeup_r, 1)
+        if self._sock in rlist:
+            self._receive_icmp()
+        for sock in wlist:
+            self._receive_tcp(sock)
+        self._expire()
+
+    def _run(self, count=None):
+        seq = 0
+        next_send = time.time()
+        while True:
+            if not self._stopped and (count is None or seq < count):
+                if time.time() >= next_send:
+                    self._send(seq & 0xffff)
+                    seq += 1
+                    next_send += self.interval
+                    continue
+                deadline = next_send
+            elif self._requests:
+                # wait replies of last requests
+                deadline = time.time() + self.timeout
+            else:
+                return
+            self._receive(deadline)
+
+    def ping(self, count=1):
+        """Ping targets and return statistics.
+
+        Args:
+            count (int): count of requests to send to each target
+
+        Returns:
+            collections.OrderedDict: TargetStats by ips
+        """
+        try:
+            self._run(count)
+        finally:
+            self.close()
+        return self.stats
+
+    def start(self, count=None):
+        """Start ping on background.
+
+        Args:
+            count (int, optional): count of requests to send to each target.
+                By default requests are sent until ``stop``.
+
+        Returns:
+            collections.OrderedDict: TargetStats by ips, which are updated
+                while ping is executing
+        """
+        self._thread = threading.Thread(target=self._run, args=(count,))
+        self._thread.daemon = True
+        self._thread.start()
+        return self.stats
+
+    def stop(self):
+        """Stop sending requests and wait replies of sent ones."""
+        self._stopped = True
+        os.write(self._wakeup_w, b'x')
+        self.wait()
+
+    def wait(self):
+        """Wait until ping on background is done."""
+        self._thread.join()
+        self.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def _get_loss(result):
+    if isinstance(result, Exception):
+        return None
+    try:
+        return result.loss
+    except ValueError:
+        return None
+
+
+class PingMatrix(object):
+    """Connectivity matrix of pings from remote hosts to ips.
+
+    All pings from each host are executed concurrently with one SSH command,
+    hosts are probed concurrently too. Successful pairs are kept between
+    probes, so only failed pairs are re-probed.
+
+    Example:
+        >>> matrix = PingMatrix({ssh_client_1: ['10.0.0.2', '8.8.8.8'],
+        ...                      ssh_client_2: ['10.0.0.1']})
+        >>> matrix.probe()
+        [(ssh_client_2, '10.0.0.1')]
+        >>> print(matrix)
+        10.0.0.3 -> 10.0.0.2: ok
+        10.0.0.3 -> 8.8.8.8: ok
+        10.0.0.2 -> 10.0.0.1: 3 of 3 packets are lost
+    """
+
+    def __init__(self, plan, count=3, workers=None):
+        """Constructor.
+
+        Args:
+            plan (dict): SSH clients of hosts to ping from and lists of ips to
+                ping from them
+            count (int, optional): count of pings to send to each ip
+            workers (int, optional): max count of hosts to probe concurrently.
+                By default all hosts are probed at once.
+        """
+        self.plan = collections.OrderedDict()
+        for remote, ips in plan.items():
+            self.plan[remote] = list(collections.OrderedDict.fromkeys(ips))
+        self.count = count
+        self.workers = workers
+        # PingResult or exception by (remote, ip) pair
+        self.results = collections.OrderedDict()
+        self.passed = set()
+
+    def __str__(self):
+        lines = []
+        for (remote, ip), result in self.results.items():
+            loss = _get_loss(result)
+            if loss == 0:
+                status = 'ok'
+            elif isinstance(result, Exception):
+                status = 'error: {!r}'.format(result)
+            elif loss is None:
+                status = 'no ping statistics: {!r}'.format(result.stdout)
+            else:
+                status = '{} of {} packets are lost'.format(
+                    loss, result.transmitted)
+            lines.append('{} -> {}: {}'.format(remote.host, ip, status))
+        return '\n'.join(lines)
+
+    @property
+    def pairs(self):
+        return [(remote, ip) for remote, ips in self.plan.items()
+                for ip in ips]
+
+    @property
+    def failed(self):
+        return [pair for pair in self.pairs if pair not in self.passed]
+
+    def _probe_remote(self, remote, ips):
+        commands = [' '.join(Pinger(ip, remote)._prepare_cmd(self.count))
+                    for ip in ips]
+        if remote.closed:
+            with remote:
+                results = remote.execute_batch(commands, parallel=True,
+                                               timeout=self.count * 10)
+        else:
+            results = remote.execute_batch(commands, parallel=True,
+                                           timeout=self.count * 10)
+
+        ping_results = []
+        for result in results:
+            ping_result = PingResult()
+            ping_result.stdout = result.stdout_bytes
+            ping_results.append(ping_result)
+        return ping_results
+
+    def probe(self):
+        """Ping failed and not probed pairs.
+
+        Returns:
+            list: failed (remote, ip) pairs
+        """
+        pending = collections.OrderedDict()
+        for remote, ip in self.failed:
+            pending.setdefault(remote, []).append(ip)
+
+        results = utils.run_concurrently(
+            lambda item: self._probe_remote(*item), pending.items(),
+            workers=self.workers, reraise=False)
+
+        for (remote, ips), ping_results in zip(pending.items(), results):
+            if isinstance(ping_results, Exception):
+                ping_results = [ping_results] * len(ips)
+            for ip, ping_result in zip(ips, ping_results):
+                self.results[remote, ip] = ping_result
+                if _get_loss(ping_result) == 0:
+                    self.passed.add((remote, ip))
+        return self.failed
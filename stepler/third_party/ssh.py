@@ -17,37 +17,135 @@ SSH client
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import contextlib
+import io
 import logging
+import os
+import re
 import select
 import socket
+import tempfile
+import threading
 import time
+import uuid
 
 import paramiko
 import six
 from six import moves
 
+from stepler.third_party import utils
+
 
 __all__ = [
-    'SshClient'
+    'RemoteJob',
+    'SshClient',
+    'SshGroup',
+    'SshPool',
 ]
 
 LOGGER = logging.getLogger(__name__)
 
+SSH_POOL_IDLE_TTL = 5 * 60
+SSH_POOL_MAX_SIZE = 50
+SSH_READ_SIZE = 32 * 1024
+
+# Functions called after each executed command with SSH client, command
+# result and command execution time, for ex: to collect metrics
+command_hooks = []
+
 
 class ExecutionTimeout(Exception):
     """Command execution timeout exception."""
 
 
+class OutputBuffer(object):
+    """Command output buffer.
+
+    Output is accumulated in memory until its size exceeds ``spill_size``,
+    after that it's moved to temporary file.
+    """
+
+    def __init__(self, spill_size=None):
+        """Constructor.
+
+        Args:
+            spill_size (int, optional): max size of output in memory. By
+                default output is kept in memory always.
+        """
+        self.spill_size = spill_size
+        self._data = bytearray()
+        self._file = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def spilled(self):
+        return self._file is not None
+
+    def append(self, value):
+        self._size += len(value)
+        if self._file is not None:
+            self._file.write(value)
+            return
+
+        self._data += value
+        if self.spill_size is not None and self._size > self.spill_size:
+            self._file = tempfile.NamedTemporaryFile()
+            self._file.write(self._data)
+            self._data = bytearray()
+
+    def getvalue(self):
+        """Get output content.
+
+        Returns:
+            bytes: output content
+        """
+        if self._file is None:
+            return bytes(self._data)
+        self._file.flush()
+        self._file.seek(0)
+        value = self._file.read()
+        self._file.seek(0, io.SEEK_END)
+        return value
+
+    def open(self):
+        """Open output content to read it by chunks.
+
+        Returns:
+            file: file-like object with output content
+        """
+        if self._file is None:
+            return io.BytesIO(self._data)
+        self._file.flush()
+        return open(self._file.name, 'rb')
+
+    def close(self):
+        """Release output content."""
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._data = bytearray()
+        self._size = 0
+
+
 class CommandResult(object):
     """Remote command result."""
 
-    def __init__(self, *args, **kwargs):
-        super(CommandResult, self).__init__(*args, **kwargs)
+    def __init__(self, spill_size=None):
+        """Constructor.
+
+        Args:
+            spill_size (int, optional): max size of stdout and stderr to keep
+                in memory, bigger output is moved to temporary files
+        """
+        super(CommandResult, self).__init__()
         self.command = None
         self.exit_code = None
-        self.stdout_bytes = b''
-        self.stderr_bytes = b''
+        self.stdout_buffer = OutputBuffer(spill_size)
+        self.stderr_buffer = OutputBuffer(spill_size)
 
     def __repr__(self):
         return (u'`{0.command}` result:\n'
@@ -59,19 +157,27 @@ class CommandResult(object):
     def is_ok(self):
         return self.exit_code == 0
 
+    @property
+    def stdout_bytes(self):
+        return self.stdout_buffer.getvalue()
+
     @property
     def stdout(self):
         return self.stdout_bytes.decode('utf-8').strip()
 
     def append_stdout(self, value):
-        self.stdout_bytes += value
+        self.stdout_buffer.append(value)
+
+    @property
+    def stderr_bytes(self):
+        return self.stderr_buffer.getvalue()
 
     @property
     def stderr(self):
         return self.stderr_bytes.decode('utf-8').strip()
 
     def append_stderr(self, value):
-        self.stderr_bytes += value
+        self.stderr_buffer.append(value)
 
     def check_exit_code(self, expected=0):
         """Check that exit code is expected."""
@@ -89,6 +195,207 @@ class CommandResult(object):
                                'is not empty:\n{0.stderr}'.format(self))
 
 
+class _PoolEntry(object):
+
+    def __init__(self, ssh):
+        self.ssh = ssh
+        self.users = 0
+        self.last_used = time.time()
+
+
+class SshPool(object):
+    """Process-wide pool of SSH connections.
+
+    Connections are shared among clients with the same host, port and
+    credentials: each command opens own session over shared transport.
+    Idle connections are closed after ``idle_ttl`` seconds or if pool size
+    exceeds ``max_size`` (least recently used are closed first).
+
+    Example:
+        >>> pool = SshPool()
+        >>> ssh = pool.acquire(key, create_ssh)
+        >>> pool.release(key, ssh)
+        >>> pool.hits, pool.misses
+        (0, 1)
+    """
+
+    def __init__(self, idle_ttl=SSH_POOL_IDLE_TTL, max_size=SSH_POOL_MAX_SIZE):
+        """Constructor.
+
+        Args:
+            idle_ttl (int, optional): seconds to keep idle connection
+            max_size (int, optional): max count of connections in pool
+        """
+        self.idle_ttl = idle_ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._reset()
+
+    def __repr__(self):
+        """Representation."""
+        return "SshPool <size={} hits={} misses={}>".format(
+            len(self), self.hits, self.misses)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        self._entries = collections.OrderedDict()
+
+    def _check_pid(self):
+        # transports can't be shared with forked process, so child process
+        # just forgets them without closing
+        if self._pid != os.getpid():
+            self._reset()
+
+    @staticmethod
+    def _is_alive(ssh):
+        transport = ssh.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except (paramiko.SSHException, socket.error, EOFError):
+            return False
+        return True
+
+    @staticmethod
+    def _close(ssh):
+        try:
+            ssh.close()
+        except Exception as e:
+            LOGGER.debug(e)
+
+    def _evict(self):
+        now = time.time()
+        idle = [(key, entry) for key, entry in self._entries.items()
+                if entry.users == 0]
+        idle.sort(key=lambda item: item[1].last_used)
+        excess = len(self._entries) - self.max_size
+
+        for key, entry in idle:
+            if excess > 0 or now - entry.last_used > self.idle_ttl:
+                del self._entries[key]
+                self._close(entry.ssh)
+                excess -= 1
+
+    def acquire(self, key, factory):
+        """Get alive connection from pool or create it with factory.
+
+        Args:
+            key (hashable): connection key
+            factory (function): function to create connected
+                ``paramiko.SSHClient``
+
+        Returns:
+            paramiko.SSHClient: connected SSH client
+        """
+        self._check_pid()
+        with self._lock:
+            self._evict()
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_alive(entry.ssh):
+                    self.hits += 1
+                    entry.users += 1
+                    return entry.ssh
+                del self._entries[key]
+                if entry.users == 0:
+                    self._close(entry.ssh)
+            self.misses += 1
+
+        ssh = factory()  # connect out of lock to not block other hosts
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:  # concurrent client has connected already
+                self._close(ssh)
+            else:
+                entry = self._entries[key] = _PoolEntry(ssh)
+            entry.users += 1
+            self._evict()
+            return entry.ssh
+
+    def put(self, key, ssh):
+        """Put connected SSH client to pool as idle connection.
+
+        Args:
+            key (hashable): connection key
+            ssh (paramiko.SSHClient): connected SSH client
+        """
+        self._check_pid()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.users > 0:
+                self._close(ssh)
+                return
+            if entry is not None:
+                self._close(entry.ssh)
+            self._entries[key] = _PoolEntry(ssh)
+            self._evict()
+
+    def release(self, key, ssh):
+        """Return connection to pool.
+
+        Args:
+            key (hashable): connection key
+            ssh (paramiko.SSHClient): SSH client got with ``acquire``
+        """
+        self._check_pid()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.ssh is not ssh:  # it was evicted
+                self._close(ssh)
+                return
+            entry.users -= 1
+            entry.last_used = time.time()
+            self._evict()
+
+    def clear(self):
+        """Close all connections of pool."""
+        self._check_pid()
+        with self._lock:
+            for entry in self._entries.values():
+                self._close(entry.ssh)
+            self._entries.clear()
+
+
+pool = SshPool()
+
+
+class _LinesCallback(object):
+    """Callback wrapper to pass output to callback by lines."""
+
+    def __init__(self, callback):
+        self._callback = callback
+        self._tails = {False: bytearray(), True: bytearray()}
+
+    def __call__(self, data, is_stderr):
+        tail = self._tails[is_stderr]
+        tail += data
+        end = tail.rfind(b'\n') + 1
+        if end:
+            for line in bytes(tail[:end]).splitlines(True):
+                self._callback(line, is_stderr)
+            del tail[:end]
+
+    def flush(self):
+        for is_stderr, tail in self._tails.items():
+            if tail:
+                self._callback(bytes(tail), is_stderr)
+                del tail[:]
+
+
+def _get_reported_pid(pid_line):
+    try:
+        return int(bytes(pid_line).split(b'\n')[0])
+    except ValueError:
+        return None
+
+
 class SshClient(object):
     """SSH client."""
 
@@ -99,7 +406,8 @@ class SshClient(object):
                  password=None,
                  pkey=None,
                  timeout=None,
-                 proxy_cmd=None):
+                 proxy_cmd=None,
+                 pooled=True):
         """Constructor.
 
         Args:
@@ -110,6 +418,8 @@ class SshClient(object):
             pkey (str, optional): private key content
             timeout (int, optional): connection timeout
             proxy_cmd (str, optional): ssh proxy command
+            pooled (bool, optional): flag whether to share connection via
+                process-wide SSH pool or not
         """
         self._host = host
         self._port = port
@@ -121,8 +431,11 @@ class SshClient(object):
         self._username = username
         self._password = password
         self._proxy_cmd = proxy_cmd
+        self._pooled = pooled
         self._sudo = False
         self._ssh = None
+        self._sftp = None
+        self._sftp_lock = threading.Lock()
 
     def __repr__(self):
         """Representation."""
@@ -143,47 +456,81 @@ class SshClient(object):
 
         return "SshClient <{}>".format(' '.join(params))
 
+    @property
+    def host(self):
+        return self._host
+
     @property
     def closed(self):
         return self._ssh is None
 
+    @property
+    def _pool_key(self):
+        fingerprint = self._pkey.get_fingerprint() if self._pkey else None
+        return (self._host, self._port, self._username, self._password,
+                fingerprint, self._proxy_cmd)
+
+    def _create_ssh(self):
+        sock = paramiko.ProxyCommand(self._proxy_cmd) \
+            if self._proxy_cmd else None
+
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            ssh.connect(
+                self._host,
+                self._port,
+                pkey=self._pkey,
+                timeout=self._timeout,
+                banner_timeout=self._timeout,
+                username=self._username,
+                password=self._password,
+                sock=sock)
+        except Exception:
+            ssh.close()
+            raise
+        return ssh
+
     def connect(self):
         """Connect to ssh server."""
         if not self.closed:
             raise RuntimeError('SSH is already opened')
 
-        sock = paramiko.ProxyCommand(self._proxy_cmd) \
-            if self._proxy_cmd else None
-
-        self._ssh = paramiko.SSHClient()
-        self._ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        self._ssh.connect(
-            self._host,
-            self._port,
-            pkey=self._pkey,
-            timeout=self._timeout,
-            banner_timeout=self._timeout,
-            username=self._username,
-            password=self._password,
-            sock=sock)
+        if self._pooled:
+            self._ssh = pool.acquire(self._pool_key, self._create_ssh)
+        else:
+            self._ssh = self._create_ssh()
 
     def close(self):
         """Close ssh connection."""
         if self.closed:
             raise RuntimeError('SSH is already closed')
-        self._ssh.close()
+        if self._sftp is not None:
+            self._sftp.close()
+            self._sftp = None
+        if self._pooled:
+            pool.release(self._pool_key, self._ssh)
+        else:
+            self._ssh.close()
         self._ssh = None
 
     def check(self):
-        """Check SSH connection."""
+        """Check SSH connection.
+
+        New connection is always established to check. If client is pooled,
+        successful connection is put to pool to be reused.
+        """
         try:
-            self.connect()
-            return True
+            ssh = self._create_ssh()
         except (paramiko.SSHException, socket.error, EOFError) as e:
             LOGGER.debug(e)
             return False
-        finally:
-            self.close()
+
+        if self._pooled:
+            pool.put(self._pool_key, ssh)
+        else:
+            ssh.close()
+        return True
 
     def __enter__(self):
         self.connect()
@@ -193,11 +540,18 @@ class SshClient(object):
         self.close()
 
     @contextlib.contextmanager
-    def sudo(self):
-        """Context manager to run command with sudo."""
-        self._sudo = True
-        yield self
-        self._sudo = False
+    def sudo(self, enabled=True):
+        """Context manager to run command with sudo.
+
+        Args:
+            enabled (bool, optional): flag whether to run command with sudo
+                or without it inside context
+        """
+        sudo, self._sudo = self._sudo, enabled
+        try:
+            yield self
+        finally:
+            self._sudo = sudo
 
     def check_call(self, command, verbose=False):
         """Call command and check that exit_code is 0.
@@ -270,17 +624,64 @@ class SshClient(object):
         Raises:
             AssertionError: if command is not running in background
         """
-        bg_command = command + ' <&- >{stdout} 2>{stderr} & echo $!'.format(
-            stdout=stdout, stderr=stderr)
-        result = self.check_call(bg_command, verbose=False)
+        bg_command = (command + ' <&- >{stdout} 2>{stderr} & pid=$!; '
+                      'echo $pid; kill -0 $pid').format(stdout=stdout,
+                                                        stderr=stderr)
+        result = self.execute(bg_command, verbose=False)
         pid = result.stdout
-        result = self.execute('ps -o pid | grep {pid}'.format(pid=pid),
-                              verbose=False)
         assert result.is_ok, (
             "Can't find `{command}` (PID: {pid}) in "
             "processes".format(command=command, pid=pid))
         return pid
 
+    def stop_background(self, pid, signal=None, timeout=0, read=(),
+                        remove=()):
+        """Stop background command, read and remove its files in one batch.
+
+        Args:
+            pid (int|str): pid of background command
+            signal (str, optional): signal name to send to process, for ex:
+                ``INT``. By default process isn't signalled and it's just
+                waited to be done.
+            timeout (int, optional): time to wait for process to be done
+            read (list, optional): paths to files to read after process is
+                done, for ex: command output
+            remove (list, optional): paths to files to remove at the end
+
+        Returns:
+            list: contents of files to read
+
+        Raises:
+            ExecutionTimeout: if process executing after timeout
+        """
+        commands = []
+        if signal:
+            commands.append('kill -{signal} {pid}'.format(signal=signal,
+                                                          pid=pid))
+        # fractional sleep may be not supported by busybox
+        sleep_command = 'sleep 0.1 2> /dev/null || sleep 1'
+        if timeout:
+            wait_command = ('end=$(($(date +%s) + {timeout})); '
+                            'while kill -0 {pid} 2> /dev/null; do '
+                            '[ $(date +%s) -ge $end ] && exit 1; {sleep}; '
+                            'done')
+        else:
+            wait_command = 'while kill -0 {pid} 2> /dev/null; do {sleep}; done'
+        commands.append(wait_command.format(pid=pid, timeout=timeout,
+                                            sleep=sleep_command))
+        commands.extend('cat {}'.format(path) for path in read)
+        if remove:
+            commands.append('rm -f {}'.format(' '.join(remove)))
+
+        results = self.execute_batch(commands)
+        wait_index = 1 if signal else 0
+        if not results[wait_index].is_ok:
+            raise ExecutionTimeout('Process {pid} is executing more than '
+                                   '{timeout} seconds'.format(pid=pid,
+                                                              timeout=timeout))
+        read_results = results[wait_index + 1:wait_index + 1 + len(read)]
+        return [result.stdout for result in read_results]
+
     def wait_process_done(self, pid, timeout=0):
         """Wait until command with `pid` will be done.
 
@@ -294,15 +695,98 @@ class SshClient(object):
         self.execute('while kill -0 {pid} 2> /dev/null; '
                      'do sleep 1; done;'.format(pid=pid), timeout=timeout)
 
+    def execute_batch(self, commands, stop_on_error=False, parallel=False,
+                      timeout=None):
+        """Execute many commands with one remote script.
+
+        Each command is executed in own subshell, its stdout, stderr and exit
+        code are separated by unique markers, so all commands cost one round
+        trip.
+
+        Example:
+            >>> results = ssh_client.execute_batch(['hostname', 'uptime'])
+            >>> [result.stdout for result in results]
+
+        Args:
+            commands (list): commands to execute
+            stop_on_error (bool, optional): flag whether to stop batch after
+                first failed command
+            parallel (bool, optional): flag whether to execute commands
+                concurrently on remote host. Output of commands is kept in
+                remote temporary directory until all commands are done.
+            timeout (int, optional): maximum batch executing time in seconds
+
+        Returns:
+            list: CommandResult instances of executed commands
+
+        Raises:
+            ExecutionTimeout: if batch executing more than timeout
+            ValueError: if parallel batch should be stopped on error
+        """
+        if parallel and stop_on_error:
+            raise ValueError("Parallel batch can't be stopped on error")
+
+        marker = 'stepler-{}'.format(uuid.uuid4().hex)
+        report = ("printf '\\n{marker} {i} %d\\n' $rc; "
+                  "printf '\\n{marker} {i}\\n' >&2")
+        script = []
+        if parallel:
+            script.append('d=$(mktemp -d)')
+            for i, command in enumerate(commands):
+                script.append(
+                    '( {command}\n) > $d/{i} 2> $d/{i}.err & p{i}=$!'.format(
+                        command=command, i=i))
+            for i in range(len(commands)):
+                script.append(
+                    ('wait $p{i}; rc=$?; cat $d/{i}; cat $d/{i}.err >&2; ' +
+                     report).format(marker=marker, i=i))
+            script.append('rm -rf $d')
+        else:
+            for i, command in enumerate(commands):
+                script.append(('( {command}\n); rc=$?; ' + report).format(
+                    command=command, marker=marker, i=i))
+                if stop_on_error:
+                    script.append('[ $rc -eq 0 ] || exit $rc')
+        batch_result = self.execute('\n'.join(script), timeout=timeout)
+
+        stdout_re = re.compile(
+            br'\n' + marker.encode() + br' (\d+) (\d+)\n')
+        stderr_re = re.compile(br'\n' + marker.encode() + br' (\d+)\n')
+        stdouts = stdout_re.split(batch_result.stdout_bytes)
+        stderrs = stderr_re.split(batch_result.stderr_bytes)
+
+        results = []
+        for i in range(len(stdouts) // 3):
+            result = CommandResult()
+            result.command = commands[i]
+            result.append_stdout(stdouts[i * 3])
+            result.exit_code = int(stdouts[i * 3 + 2])
+            if i * 2 < len(stderrs):
+                result.append_stderr(stderrs[i * 2])
+            results.append(result)
+        return results
+
     def execute(self, command, merge_stderr=False, verbose=False,
-                timeout=None):
+                timeout=None, spill_size=None, callback=None, by_lines=False):
         """Execute command and returns CommandResult instance.
 
+        Example:
+            >>> def callback(data, is_stderr):
+            ...     print(data)
+            >>> ssh_client.execute('tail -f /var/log/syslog', timeout=60,
+            ...                    callback=callback, by_lines=True)
+
         Args:
             command (str): command to execute
             merge_stderr (bool): merge stderr to stdout
             verbose (bool): make log records or not
             timeout (int, optional): maximum command executing time in seconds
+            spill_size (int, optional): max size of output to keep in memory,
+                bigger output is moved to temporary file
+            callback (function, optional): function to call with output data
+                and flag whether it's stderr as soon as output is received
+            by_lines (bool, optional): flag whether to pass output to callback
+                by lines or by received chunks
 
         Returns:
             object: CommandResult instance
@@ -310,28 +794,45 @@ class SshClient(object):
         Raises:
             ExecutionTimeout: if command executing more than timeout
         """
+        start = time.time()
+        # remote process group id is reported with first stdout line to kill
+        # process on timeout
         chan, stdin, stdout, stderr = self.execute_async(
-            command, merge_stderr=merge_stderr)
+            command, merge_stderr=merge_stderr, report_pid=bool(timeout))
 
-        result = CommandResult()
+        result = CommandResult(spill_size=spill_size)
         result.command = command
+        if callback is not None and by_lines:
+            callback = _LinesCallback(callback)
+        pid_line = bytearray() if timeout else None
+
+        def _receive(data, is_stderr):
+            if is_stderr:
+                result.append_stderr(data)
+            else:
+                result.append_stdout(data)
+            if callback is not None:
+                callback(data, is_stderr)
 
-        start = time.time()
-        while not chan.closed or chan.recv_ready() or chan.recv_stderr_ready():
-            select.select([chan], [], [chan], 60)
-
-            if chan.recv_ready():
-                result.append_stdout(chan.recv(1024))
-            if chan.recv_stderr_ready():
-                result.append_stderr(chan.recv_stderr(1024))
-
-            if timeout and (time.time() > start + timeout):
+        try:
+            deadline = start + timeout if timeout else None
+            if not self._read_channel(chan, _receive, pid_line=pid_line,
+                                      deadline=deadline):
+                self._signal_remote(_get_reported_pid(pid_line), 'KILL',
+                                    sudo=self._sudo)
                 chan.close()
-                raise ExecutionTimeout('Executing `{cmd}` is too long '
-                                       '(more than {timeout} seconds)'.format(
-                                           cmd=command, timeout=timeout))
+                raise ExecutionTimeout(
+                    'Executing `{cmd}` is too long (more than '
+                    '{timeout} seconds)'.format(cmd=command, timeout=timeout))
+
+            if isinstance(callback, _LinesCallback):
+                callback.flush()
+            result.exit_code = chan.recv_exit_status()
+        finally:
+            elapsed = time.time() - start
+            for hook in command_hooks:
+                hook(self, result, elapsed)
 
-        result.exit_code = chan.recv_exit_status()
         stdin.close()
         stdout.close()
         stderr.close()
@@ -345,13 +846,16 @@ class SshClient(object):
                 LOGGER.debug(u'Stderr:\n{0}'.format(result.stderr))
         return result
 
-    def execute_async(self, command, merge_stderr=False, verbose=False):
+    def execute_async(self, command, merge_stderr=False, verbose=False,
+                      report_pid=False):
         """Start executing command async.
 
         Args:
             command (str): command to execute
             merge_stderr (bool): merge stderr to stdout
             verbose (bool): make log records or not
+            report_pid (bool): flag whether to print pid of remote shell
+                (which is process group id of command) with first stdout line
 
         Returns:
             tuple: SSH session, file-like stdin, stdout, stderr
@@ -365,9 +869,97 @@ class SshClient(object):
         stderr = chan.makefile_stderr('rb')
         if self._sudo:
             command = "sudo -s $SHELL -c " + moves.shlex_quote(command)
+        if report_pid:
+            command = "echo $$; " + command
         chan.exec_command(command)
         return chan, stdin, stdout, stderr
 
+    @staticmethod
+    def _read_channel(chan, receive, pid_line=None, deadline=None):
+        """Read channel output until command is done or deadline is reached.
+
+        Args:
+            chan (paramiko.Channel): SSH session
+            receive (function): function to call with output data and flag
+                whether it's stderr
+            pid_line (bytearray, optional): buffer to put first stdout line
+                with reported pid to
+            deadline (float, optional): timestamp to stop reading at
+
+        Returns:
+            bool: True if command is done, False if deadline is reached
+        """
+        while True:
+            if chan.recv_ready():
+                data = chan.recv(SSH_READ_SIZE)
+                if pid_line is not None and b'\n' not in pid_line:
+                    pid_line += data
+                    if b'\n' not in pid_line:
+                        continue
+                    data = bytes(pid_line[pid_line.index(b'\n') + 1:])
+                if data:
+                    receive(data, False)
+                continue
+
+            if chan.recv_stderr_ready():
+                receive(chan.recv_stderr(SSH_READ_SIZE), True)
+                continue
+
+            # all output is received
+            if chan.eof_received or chan.closed:
+                if chan.exit_status_ready():
+                    return True
+
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+
+            if chan.eof_received or chan.closed:
+                # channel pipe is always set after EOF
+                chan.status_event.wait(remaining)
+            else:
+                select.select([chan], [], [], remaining)
+
+    def _signal_remote(self, pid, signal, sudo=False):
+        """Send signal to remote process group by its id."""
+        if pid is None:
+            LOGGER.debug("Can't get pid of remote process to send signal")
+            return
+
+        kill_command = 'kill -{signal} -{pid}'.format(signal=signal, pid=pid)
+        if sudo:
+            kill_command = "sudo " + kill_command
+        try:
+            chan = self._ssh.get_transport().open_session(
+                timeout=self._timeout)
+            chan.exec_command(kill_command)
+            chan.status_event.wait(self._timeout or 10)
+            chan.close()
+        except (paramiko.SSHException, socket.error, EOFError) as e:
+            LOGGER.debug("Can't send signal to remote process {}: {}".format(
+                pid, e))
+
+    @staticmethod
+    def execute_many(clients, command, timeout=None, workers=None, **kwargs):
+        """Execute command on many SSH clients concurrently.
+
+        It's shortcut for ``SshGroup(clients, workers).execute(...)``.
+
+        Args:
+            clients (list): SSH clients
+            command (str): command to execute
+            timeout (int|dict, optional): command timeout or timeouts by host
+            workers (int, optional): max count of concurrent executions
+            **kwargs: other ``execute`` arguments
+
+        Returns:
+            GroupResult: command results by host
+        """
+        return SshGroup(clients, workers=workers).execute(
+            command, timeout=timeout, **kwargs)
+
     @contextlib.contextmanager
     def open(self, path, mode='r'):
         """Open remote file with SFTP.
@@ -380,5 +972,409 @@ class SshClient(object):
         Yields:
             obj: an SFTPFile object representing the open file
         """
-        with self._ssh.open_sftp() as sftp:
-            yield sftp.open(path, mode)
+        with self._get_sftp().open(path, mode) as f:
+            yield f
+
+    def _get_sftp(self):
+        """Get SFTP session cached for connection, open it if needed."""
+        with self._sftp_lock:
+            if self._sftp is None or self._sftp.sock.closed:
+                self._sftp = self._ssh.open_sftp()
+            return self._sftp
+
+    def get_file(self, remote_path, local_path, callback=None):
+        """Download remote file with SFTP.
+
+        File is streamed to local file with pipelined read requests, so
+        memory usage doesn't depend on file size.
+
+        Args:
+            remote_path (str): path to remote file
+            local_path (str): path to local file
+            callback (function, optional): function called with transferred
+                and total bytes count after each chunk
+        """
+        self._get_sftp().get(remote_path, local_path, callback=callback)
+
+    def put_file(self, local_path, remote_path, callback=None):
+        """Upload local file with SFTP.
+
+        Args:
+            local_path (str): path to local file
+            remote_path (str): path to remote file
+            callback (function, optional): function called with transferred
+                and total bytes count after each chunk
+        """
+        self._get_sftp().put(local_path, remote_path, callback=callback)
+
+    def get_many(self, remote_paths, local_dir=None):
+        """Download many remote files with same SFTP session.
+
+        Args:
+            remote_paths (list|dict): paths to remote files or mapping of
+                remote path to local path
+            local_dir (str, optional): local directory to put files with
+                remote names to, if ``remote_paths`` is list. New temporary
+                directory is created by default.
+
+        Returns:
+            collections.OrderedDict: local paths by remote paths
+
+        Raises:
+            ValueError: if remote files have same names
+        """
+        if isinstance(remote_paths, dict):
+            paths = collections.OrderedDict(remote_paths)
+        else:
+            local_dir = local_dir or tempfile.mkdtemp()
+            paths = collections.OrderedDict(
+                (remote_path,
+                 os.path.join(local_dir, os.path.basename(remote_path)))
+                for remote_path in remote_paths)
+            if len(set(paths.values())) < len(paths):
+                raise ValueError(
+                    "Remote files {!r} have same names".format(remote_paths))
+
+        for remote_path, local_path in paths.items():
+            self.get_file(remote_path, local_path)
+        return paths
+
+
+class RemoteJob(object):
+    """Command running on remote host on background with own SSH session.
+
+    Command output is streamed over its SSH session (without temporary files
+    and polling commands) and is accumulated to ``result``. Job is signalled
+    by its process group id, which is reported by remote shell at start.
+
+    Example:
+        >>> with RemoteJob(ssh_client, 'ping 10.0.0.1') as job:
+        ...     some_action()
+        >>> job.result.stdout
+
+        >>> pcap_path = RemoteJob.temp_path('.pcap')
+        >>> job = RemoteJob(ssh_client, 'tcpdump -w {}'.format(pcap_path),
+        ...                 remote_files=[pcap_path])
+        >>> job.start()
+        >>> job.wait_output('listening on', timeout=10)
+        >>> job.stop('INT', timeout=5)
+        >>> job.fetch(pcap_path, local_path)
+        >>> job.cleanup()
+    """
+
+    def __init__(self, client, command, sudo=None, remote_files=(),
+                 callback=None, by_lines=False, spill_size=None):
+        """Constructor.
+
+        Args:
+            client (SshClient): connected SSH client
+            command (str): command to execute
+            sudo (bool, optional): flag whether to execute command with sudo.
+                By default it's executed with sudo inside ``client.sudo()``
+                context only.
+            remote_files (list, optional): paths to remote files produced by
+                command to remove on cleanup
+            callback (function, optional): function to call with output data
+                and flag whether it's stderr as soon as output is received
+            by_lines (bool, optional): flag whether to pass output to callback
+                by lines or by received chunks
+            spill_size (int, optional): max size of output to keep in memory,
+                bigger output is moved to temporary file
+        """
+        self.client = client
+        self.command = command
+        self.sudo = client._sudo if sudo is None else sudo
+        self.pid = None
+        self.result = CommandResult(spill_size=spill_size)
+        self.result.command = command
+        if callback is not None and by_lines:
+            callback = _LinesCallback(callback)
+        self._callback = callback
+        self._remote_files = list(remote_files)
+        self._chan = None
+        self._reader = None
+        self._output_received = threading.Condition()
+
+    def __repr__(self):
+        """Representation."""
+        return "RemoteJob <host={!r} pid={} command={!r}>".format(
+            self.client.host, self.pid, self.command)
+
+    @property
+    def running(self):
+        return self._reader is not None and self._reader.is_alive()
+
+    @staticmethod
+    def temp_path(suffix=''):
+        """Get unique path to remote temporary file.
+
+        Args:
+            suffix (str, optional): file name suffix
+
+        Returns:
+            str: path to remote file
+        """
+        return '/tmp/stepler-{}{}'.format(uuid.uuid4().hex, suffix)
+
+    def start(self):
+        """Start command."""
+        if self._chan is not None:
+            raise RuntimeError('Job is already started')
+
+        with self.client.sudo(self.sudo):
+            self._chan = self.client.execute_async(self.command,
+                                                   report_pid=True)[0]
+
+        pid_line = bytearray()
+        self._chan.settimeout(self.client._timeout)
+        while b'\n' not in pid_line:
+            data = self._chan.recv(SSH_READ_SIZE)
+            if not data:
+                raise RuntimeError("Can't start `{}` on {}".format(
+                    self.command, self.client.host))
+            pid_line += data
+        self._chan.settimeout(None)
+        self.pid = _get_reported_pid(pid_line)
+        rest = bytes(pid_line[pid_line.index(b'\n') + 1:])
+        if rest:
+            self._receive(rest, False)
+
+        self._reader = threading.Thread(target=self._read)
+        self._reader.daemon = True
+        self._reader.start()
+
+    def _receive(self, data, is_stderr):
+        with self._output_received:
+            if is_stderr:
+                self.result.append_stderr(data)
+            else:
+                self.result.append_stdout(data)
+            self._output_received.notify_all()
+        if self._callback is not None:
+            self._callback(data, is_stderr)
+
+    def _read(self):
+        try:
+            self.client._read_channel(self._chan, self._receive)
+            if isinstance(self._callback, _LinesCallback):
+                self._callback.flush()
+            self.result.exit_code = self._chan.recv_exit_status()
+        finally:
+            with self._output_received:
+                self._output_received.notify_all()
+
+    def wait_output(self, text, timeout=None):
+        """Wait until text appears in command stdout or stderr.
+
+        Args:
+            text (str): text to wait for
+            timeout (int, optional): max time to wait in seconds
+
+        Raises:
+            ExecutionTimeout: if text doesn't appear before timeout
+            RuntimeError: if command is done without text in output
+        """
+        text = text.encode('utf-8')
+        deadline = time.time() + timeout if timeout else None
+        with self._output_received:
+            while True:
+                if (text in self.result.stdout_bytes or
+                        text in self.result.stderr_bytes):
+                    return
+                if not self.running:
+                    raise RuntimeError(
+                        '`{}` is done without {!r} in output:\n{!r}'.format(
+                            self.command, text, self.result))
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise ExecutionTimeout(
+                            'No {!r} in `{}` output after {} seconds'.format(
+                                text, self.command, timeout))
+                self._output_received.wait(remaining)
+
+    def wait(self, timeout=None):
+        """Wait until command is done.
+
+        Args:
+            timeout (int, optional): max time to wait in seconds
+
+        Returns:
+            CommandResult: command result
+
+        Raises:
+            ExecutionTimeout: if command is executing after timeout
+        """
+        self._reader.join(timeout)
+        if self._reader.is_alive():
+            raise ExecutionTimeout(
+                'Executing `{cmd}` is too long (more than {timeout} '
+                'seconds)'.format(cmd=self.command, timeout=timeout))
+        return self.result
+
+    def signal(self, signal):
+        """Send signal to command process group.
+
+        Args:
+            signal (str): signal name, for ex: ``INT``
+        """
+        self.client._signal_remote(self.pid, signal, sudo=self.sudo)
+
+    def stop(self, signal='INT', timeout=10):
+        """Stop command with signal and wait until it's done.
+
+        If command is still executing after timeout, it's killed.
+
+        Args:
+            signal (str, optional): signal name to stop command with
+            timeout (int, optional): time to wait for command to be done
+                after signal
+
+        Returns:
+            CommandResult: command result
+
+        Raises:
+            ExecutionTimeout: if command is executing after timeout
+        """
+        if self.running:
+            self.signal(signal)
+            try:
+                self.wait(timeout)
+            except ExecutionTimeout:
+                self.signal('KILL')
+                raise
+        return self.result
+
+    def fetch(self, remote_path, local_path):
+        """Download file produced by command.
+
+        Args:
+            remote_path (str): path to remote file
+            local_path (str): path to local file
+        """
+        self.client.get_file(remote_path, local_path)
+
+    def cleanup(self):
+        """Kill command if it's executing and remove its remote files."""
+        if self.running:
+            self.signal('KILL')
+        if self._remote_files:
+            rm_command = 'rm -f {}'.format(' '.join(self._remote_files))
+            with self.client.sudo(self.sudo):
+                self.client.execute(rm_command)
+            self._remote_files = []
+        if self._chan is not None:
+            self._chan.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.stop()
+        finally:
+            self.cleanup()
+
+
+class GroupResult(collections.OrderedDict):
+    """Results of command executed on SSH group.
+
+    It maps host to ``CommandResult``. Hosts where command execution failed
+    with exception (for ex: connection error or timeout) are put to
+    ``errors`` attribute instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(GroupResult, self).__init__(*args, **kwargs)
+        self.errors = collections.OrderedDict()
+
+    @property
+    def is_ok(self):
+        return not self.errors and all(result.is_ok
+                                       for result in self.values())
+
+    def check_exit_code(self, expected=0):
+        """Check that command is executed on all hosts with expected code."""
+        messages = ['{}: {}'.format(host, error)
+                    for host, error in self.errors.items()]
+        for host, result in self.items():
+            if result.exit_code != expected:
+                messages.append('{}: exit code is {}'.format(
+                    host, result.exit_code))
+        if messages:
+            command = next(iter(self.values())).command if self else None
+            raise RuntimeError(
+                'Command {!r} is failed on hosts:\n{}'.format(
+                    command, '\n'.join(messages)))
+
+
+class SshGroup(object):
+    """Group of SSH clients to execute commands concurrently.
+
+    Example:
+        >>> group = SshGroup([ssh_1, ssh_2], workers=10)
+        >>> results = group.execute('hostname', timeout={ssh_1.host: 5})
+        >>> results.check_exit_code()
+    """
+
+    def __init__(self, clients, workers=None):
+        """Constructor.
+
+        Args:
+            clients (list): SSH clients with unique hosts
+            workers (int, optional): max count of concurrent executions. By
+                default all clients execute commands concurrently.
+
+        Raises:
+            ValueError: if clients hosts are not unique
+        """
+        self.clients = list(clients)
+        self.workers = workers
+        hosts = [client.host for client in self.clients]
+        if len(set(hosts)) != len(hosts):
+            raise ValueError('SSH clients hosts should be unique')
+
+    def __repr__(self):
+        """Representation."""
+        return "SshGroup <hosts={!r}>".format(
+            [client.host for client in self.clients])
+
+    def execute(self, command, timeout=None, **kwargs):
+        """Execute command on all clients.
+
+        Closed clients are connected before execution and closed after it.
+
+        Args:
+            command (str): command to execute
+            timeout (int|dict, optional): command timeout or timeouts by host
+            **kwargs: other ``SshClient.execute`` arguments
+
+        Returns:
+            GroupResult: command results by host
+        """
+        def _execute(client):
+            host_timeout = timeout
+            if isinstance(timeout, dict):
+                host_timeout = timeout.get(client.host)
+
+            if client.closed:
+                with client:
+                    return client.execute(command, timeout=host_timeout,
+                                          **kwargs)
+            return client.execute(command, timeout=host_timeout, **kwargs)
+
+        results = utils.run_concurrently(_execute, self.clients,
+                                         workers=self.workers,
+                                         reraise=False)
+        group_result = GroupResult()
+        for client, result in zip(self.clients, results):
+            if isinstance(result, Exception):
+                LOGGER.debug('Command {!r} is failed on {}: {}'.format(
+                    command, client.host, result))
+                group_result.errors[client.host] = result
+            else:
+                group_result[client.host] = result
+        return group_result
@@ -17,15 +17,39 @@ tcpdump helpers
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import contextlib
+import heapq
+import inspect
+import os
 import tempfile
 import time
 
 from hamcrest import assert_that, is_in  # noqa H301
 import scapy.all as scapy
+from six import moves
 
+from stepler.third_party import cache
+from stepler.third_party import pcap
+from stepler.third_party import ssh
+from stepler.third_party import utils
 
+START_TIMEOUT = 60
 TYPE_ICMP_REPLY = 0
+IP_PROTOS = pcap.IP_PROTOS
+PacketInfo = pcap.PacketInfo
+
+# Packet of CaptureSession. ``time`` is packet timestamp converted to local
+# clock, ``info`` is PacketInfo with original timestamp.
+CapturedPacket = collections.namedtuple(
+    'CapturedPacket', ['time', 'node', 'label', 'info'])
+
+# Moving of traffic from one node to another. ``gap`` is time between last
+# packet on ``from_node`` and first packet on ``to_node``.
+Handover = collections.namedtuple(
+    'Handover', ['from_node', 'to_node', 'last_time', 'first_time', 'gap'])
+
+_indexes = cache.Cache('pcap indexes')
 
 
 def read_pcap(path, lfilter=None):
@@ -44,21 +68,274 @@ def read_pcap(path, lfilter=None):
             yield packet
 
 
+def _has_proto(info, proto):
+    while info is not None:
+        if info.proto == proto:
+            return True
+        info = info.inner
+    return False
+
+
 def filter_icmp(packet):
-    """Returns True if packet contains ICMP layer."""
+    """Returns True if packet (or PacketInfo) contains ICMP layer."""
+    if isinstance(packet, PacketInfo):
+        return _has_proto(packet, 'icmp')
     return scapy.ICMP in packet
 
 
 def filter_vxlan(packet):
-    """Returns True if packet contains VxLAN layer."""
+    """Returns True if packet (or PacketInfo) contains VxLAN layer."""
+    if isinstance(packet, PacketInfo):
+        return _has_proto(packet, 'vxlan')
     return scapy.VXLAN in packet
 
 
+def _packet_info_from_scapy(packet, timestamp):
+    if scapy.ARP in packet:
+        arp = packet[scapy.ARP]
+        return PacketInfo(time=timestamp, proto='arp', src=arp.psrc,
+                          dst=arp.pdst)
+    if scapy.IP not in packet:
+        return PacketInfo(time=timestamp)
+
+    ip = packet[scapy.IP]
+    fields = dict(time=timestamp, proto=IP_PROTOS.get(ip.proto,
+                                                      str(ip.proto)),
+                  src=ip.src, dst=ip.dst)
+    if isinstance(ip.payload, scapy.ICMP):
+        fields.update(icmp_type=ip.payload.type, icmp_id=ip.payload.id)
+    elif isinstance(ip.payload, (scapy.TCP, scapy.UDP)):
+        fields.update(sport=ip.payload.sport, dport=ip.payload.dport)
+        if isinstance(ip.payload.payload, scapy.VXLAN):
+            vxlan = ip.payload.payload
+            fields.update(proto='vxlan', vni=vxlan.vni,
+                          inner=_packet_info_from_scapy(vxlan.payload,
+                                                        timestamp))
+    return PacketInfo(**fields)
+
+
+def read_packet_infos(path):
+    """Read pcap file with fast headers parser and yields packets summaries.
+
+    File is read by one pass. scapy is used only if file format or link type
+    isn't supported by fast parser.
+
+    Args:
+        path (str): path to pcap file
+
+    Yields:
+        PacketInfo: packet headers summary
+    """
+    if pcap.is_supported(path):
+        for info in pcap.read_packet_infos(path):
+            yield info
+        return
+
+    for packet in read_pcap(path):
+        yield _packet_info_from_scapy(packet, packet.time)
+
+
+class PcapIndex(object):
+    """Index of pcap file packets.
+
+    Packets headers are parsed once and indexed by protocol, addresses, VNI
+    and ICMP type, so many checks can query the same file without decoding
+    packets again.
+
+    Example:
+        >>> index = get_pcap_index(pcap_path)
+        >>> index.query(proto='arp', src='10.0.0.1')
+        >>> index.query(proto='vxlan', inner={'proto': 'icmp'})
+    """
+
+    indexed_fields = ('proto', 'src', 'dst', 'vni', 'icmp_type')
+
+    def __init__(self, path):
+        """Constructor.
+
+        Args:
+            path (str): path to pcap file
+        """
+        self.path = path
+        self.packets = []
+        self._indexes = dict((field, collections.defaultdict(list))
+                             for field in self.indexed_fields)
+        for info in read_packet_infos(path):
+            self._add(info)
+
+    def __len__(self):
+        return len(self.packets)
+
+    def _add(self, info):
+        position = len(self.packets)
+        self.packets.append(info)
+        for field in self.indexed_fields:
+            value = getattr(info, field)
+            if value is not None:
+                self._indexes[field][value].append(position)
+
+    def query(self, inner=None, **filters):
+        """Get packets matching filters.
+
+        Args:
+            inner (dict, optional): filters for encapsulated packet
+            **filters: values of PacketInfo fields
+
+        Returns:
+            list: matched PacketInfo records in capture order
+
+        Raises:
+            ValueError: if filter field is unknown
+        """
+        unknown = set(filters) - set(PacketInfo._fields)
+        if unknown:
+            raise ValueError('Unknown packet fields {}'.format(
+                sorted(unknown)))
+
+        candidates = None
+        for field, value in filters.items():
+            if field in self._indexes:
+                positions = self._indexes[field].get(value, [])
+                if candidates is None or len(positions) < len(candidates):
+                    candidates = positions
+        if candidates is None:
+            packets = self.packets
+        else:
+            packets = [self.packets[position] for position in candidates]
+
+        return [info for info in packets
+                if _match_packet(info, filters, inner)]
+
+
+def _match_packet(info, filters, inner):
+    for field, value in filters.items():
+        if getattr(info, field) != value:
+            return False
+    if inner is not None:
+        inner = dict(inner)
+        inner_inner = inner.pop('inner', None)
+        return (info.inner is not None and
+                _match_packet(info.inner, inner, inner_inner))
+    return True
+
+
+def get_pcap_index(path):
+    """Get cached index of pcap file.
+
+    Index is built again if file is changed.
+
+    Args:
+        path (str): path to pcap file
+
+    Returns:
+        PcapIndex: index of pcap file
+    """
+    stat = os.stat(path)
+    return _indexes.get((path, stat.st_mtime, stat.st_size), PcapIndex, path)
+
+
+def get_tcpdump_cmd(path, args='', prefix=None, bpf_filter=None,
+                    file_size=None, file_count=None):
+    """Make command to capture packets to pcap file.
+
+    If ``file_size`` is passed, packets are written to ring buffer of files
+    named by ``path`` with numeric suffixes.
+
+    Args:
+        path (str): path to pcap file
+        args (str, optional): additional ``tcpdump`` args
+        prefix (str, optional): prefix for command. It can be useful for
+            executing tcpdump on ip namespace.
+        bpf_filter (str, optional): BPF filter to capture matched packets
+            only
+        file_size (int, optional): max size of pcap file in megabytes
+        file_count (int, optional): max count of pcap files in ring buffer.
+            By default files count is unlimited.
+
+    Returns:
+        str: tcpdump command
+
+    Raises:
+        ValueError: if ``file_count`` is passed without ``file_size``
+    """
+    if file_count is not None and file_size is None:
+        raise ValueError('file_count requires file_size')
+
+    cmd = "tcpdump -w{path} {args}".format(path=path, args=args)
+    if prefix:
+        cmd = "{} {}".format(prefix, cmd)
+    if file_size is not None:
+        cmd += " -C {}".format(file_size)
+    if file_count is not None:
+        cmd += " -W {}".format(file_count)
+    if bpf_filter:
+        cmd += " " + moves.shlex_quote(bpf_filter)
+    return cmd
+
+
+def _get_files_expr(path):
+    # ring buffer files ordered from the oldest one
+    return "$(ls -tr {}*)".format(path)
+
+
+def get_merge_cmd(path, merged_path, bpf_filter=None):
+    """Make command to merge pcap files of ring buffer to one file.
+
+    Files are concatenated without header of each file except the first one.
+
+    Args:
+        path (str): path to pcap file passed to ``get_tcpdump_cmd``
+        merged_path (str): path to merged pcap file. It shouldn't start with
+            ``path``.
+        bpf_filter (str, optional): BPF filter to keep matched packets only
+
+    Returns:
+        str: merge command
+    """
+    read_cmd = 'cat $f'
+    if bpf_filter:
+        read_cmd = 'tcpdump -r $f -w - {}'.format(
+            moves.shlex_quote(bpf_filter))
+    return ("header=1; for f in {files}; do {read_cmd} | "
+            "if [ $header = 1 ]; then cat; else tail -c +{offset}; fi; "
+            "header=0; done > {merged_path}").format(
+                files=_get_files_expr(path), read_cmd=read_cmd,
+                offset=pcap.PCAP_HEADER_SIZE + 1, merged_path=merged_path)
+
+
+def get_summary_cmd(path):
+    """Make command to summarize flows of pcap files on remote node.
+
+    Command prints JSON which can be loaded with ``pcap.load_summary``.
+
+    Args:
+        path (str): path to pcap file passed to ``get_tcpdump_cmd``
+
+    Returns:
+        str: summary command
+    """
+    source = moves.shlex_quote(inspect.getsource(pcap))
+    return "$(command -v python || command -v python3) -c {} {}".format(
+        source, _get_files_expr(path))
+
+
+def _fetch_capture(remote, remote_path, local_path, merged_path=None):
+    """Download pcap file, merging ring buffer files if ``merged_path``."""
+    if merged_path is not None:
+        with remote.sudo():
+            remote.check_call(get_merge_cmd(remote_path, merged_path))
+        remote_path = merged_path
+    remote.get_file(remote_path, local_path)
+
+
 @contextlib.contextmanager
-def tcpdump(remote, args='', prefix=None, latency=2, lfilter=None):
+def tcpdump(remote, args='', prefix=None, latency=2, lfilter=None,
+            bpf_filter=None, file_size=None, file_count=None, summary=False):
     """Non-blocking context manager for run tcpdump on backgroud.
 
-    It yields path to pcap file.
+    It yields path to pcap file. If ``summary`` is True, pcap file isn't
+    downloaded and it yields list, which will be filled with flows summaries
+    calculated on remote node after tcpdump termination.
 
     Args:
         remote (SshClient): instance of ssh client
@@ -70,33 +347,46 @@ def tcpdump(remote, args='', prefix=None, latency=2, lfilter=None):
             captured
         lfilter (function, optional): function to filter returned packets. By
             default all packets will be returned.
+        bpf_filter (str, optional): BPF filter to capture matched packets
+            only
+        file_size (int, optional): max size of pcap file in megabytes. If
+            passed, packets are captured to ring buffer of files.
+        file_count (int, optional): max count of pcap files in ring buffer
+        summary (bool, optional): flag whether to get flows summaries instead
+            of pcap file
 
     Yields:
-        str: path to pcap file
+        str|list: path to pcap file or list of pcap.FlowSummary
     """
     pcap_file = tempfile.mktemp()
-    stdout_file = tempfile.mktemp()
-    cmd = "tcpdump -w{pcap_file} {args}".format(args=args, pcap_file=pcap_file)
-    if prefix:
-        cmd = "{} {}".format(prefix, cmd)
-    with remote.sudo():
-        pid = remote.background_call(cmd, stdout=stdout_file)
+    remote_pcap_file = ssh.RemoteJob.temp_path('.pcap')
+    merged_pcap_file = ssh.RemoteJob.temp_path('.pcap')
+    cmd = get_tcpdump_cmd(remote_pcap_file, args=args, prefix=prefix,
+                          bpf_filter=bpf_filter, file_size=file_size,
+                          file_count=file_count)
+    flows = []
+    with ssh.RemoteJob(remote, cmd, sudo=True,
+                       remote_files=[remote_pcap_file + '*',
+                                     merged_pcap_file]) as job:
         # wait tcpdump to start
-        remote.execute('while [ ! -f {} ]; do sleep 1; done'.format(pcap_file))
+        job.wait_output('listening on', timeout=START_TIMEOUT)
         # tcpdump need some more time to start packets capturing
         time.sleep(latency)
 
-    yield pcap_file
+        yield flows if summary else pcap_file
 
-    # wait some time to allow tcpdump to process all packets
-    time.sleep(latency)
-    with remote.sudo():
-        remote.execute('kill -SIGINT {}'.format(pid))
-        remote.wait_process_done(pid, timeout=latency)
-        with remote.open(pcap_file) as src:
-            with open(pcap_file, 'wb') as dst:
-                dst.write(src.read())
-        remote.execute('rm {}'.format(pcap_file))
+        # wait some time to allow tcpdump to process all packets
+        time.sleep(latency)
+        job.stop('INT', timeout=latency)
+        if summary:
+            with remote.sudo():
+                result = remote.check_call(get_summary_cmd(remote_pcap_file))
+            flows.extend(pcap.load_summary(result.stdout))
+        else:
+            if file_size is None:
+                merged_pcap_file = None
+            _fetch_capture(remote, remote_pcap_file, pcap_file,
+                           merged_path=merged_pcap_file)
 
 
 def get_last_ping_reply_ts(path):
@@ -105,15 +395,247 @@ def get_last_ping_reply_ts(path):
     If there are no replies in packets - it returns None.
 
     Args:
-        packets (list): list packets
+        path (str): path to pcap file
 
     Returns:
         float|None: last ICMP reply timestamp or None
     """
-    last_replied_ts = None
-    for packet in read_pcap(path, lfilter=filter_icmp):
-        if not filter_icmp(packet):
-            continue
-        if packet[scapy.ICMP].type == TYPE_ICMP_REPLY:
-            last_replied_ts = max(last_replied_ts, packet.time)
-    return last_replied_ts
+    index = get_pcap_index(path)
+    replies = index.query(proto='icmp', icmp_type=TYPE_ICMP_REPLY)
+    # ICMP encapsulated to VxLAN is considered too
+    replies += index.query(proto='vxlan',
+                           inner={'proto': 'icmp',
+                                  'icmp_type': TYPE_ICMP_REPLY})
+    return max([info.time for info in replies] or [None])
+
+
+def get_clock_offset(remote):
+    """Estimate offset of remote node clock from local clock.
+
+    Remote time is compared with middle of command execution interval, so
+    accuracy is half of command round-trip time.
+
+    Args:
+        remote (SshClient): instance of ssh client
+
+    Returns:
+        float: seconds to subtract from remote timestamp to get local one
+    """
+    start = time.time()
+    result = remote.check_call('date +%s.%N')
+    end = time.time()
+    return float(result.stdout) - (start + end) / 2
+
+
+class _Capture(object):
+    """tcpdump capture of CaptureSession."""
+
+    def __init__(self, remote, node, label, **tcpdump_kwargs):
+        self.remote = remote
+        self.node = node
+        self.label = label
+        self.remote_path = ssh.RemoteJob.temp_path('.pcap')
+        self.merged_path = None
+        self.local_path = None
+        remote_files = [self.remote_path + '*']
+        if tcpdump_kwargs.get('file_size') is not None:
+            self.merged_path = ssh.RemoteJob.temp_path('.pcap')
+            remote_files.append(self.merged_path)
+        cmd = get_tcpdump_cmd(self.remote_path, **tcpdump_kwargs)
+        self.job = ssh.RemoteJob(remote, cmd, sudo=True,
+                                 remote_files=remote_files)
+
+
+class CaptureSession(object):
+    """Concurrent tcpdump captures on many nodes and ip namespaces.
+
+    Captures are started, stopped and downloaded concurrently. Packets of all
+    captures are merged to one stream ordered by time converted to local
+    clock, so traffic moving between nodes can be measured by one pass.
+
+    Example:
+        >>> session = CaptureSession()
+        >>> for node, remote in nodes_ssh.items():
+        ...     session.add(remote, node, args='-i any icmp',
+        ...                 prefix='ip netns exec qrouter-<id>')
+        >>> with session:
+        ...     ban_l3_agent()
+        >>> session.get_handovers(filter_icmp)
+    """
+
+    def __init__(self, latency=2, workers=None):
+        """Constructor.
+
+        Args:
+            latency (int, optional): time to wait after captures starting and
+                before captures termination to guarantee that all packets will
+                be captured
+            workers (int, optional): max count of nodes processed
+                concurrently. By default all nodes are processed at once.
+        """
+        self.latency = latency
+        self.workers = workers
+        self.captures = []
+        self.clock_offsets = {}
+
+    def add(self, remote, node, label=None, args='', prefix=None,
+            bpf_filter=None, file_size=None, file_count=None):
+        """Add capture to session.
+
+        Args:
+            remote (SshClient): instance of ssh client to node
+            node (str): node name to label packets
+            label (str, optional): capture name to label packets. By default
+                command prefix is used.
+            args (str, optional): additional ``tcpdump`` args
+            prefix (str, optional): prefix for command. It can be useful for
+                executing tcpdump on ip namespace.
+            bpf_filter (str, optional): BPF filter to capture matched packets
+                only
+            file_size (int, optional): max size of pcap file in megabytes
+            file_count (int, optional): max count of pcap files in ring buffer
+
+        Raises:
+            ValueError: if capture with the same node and label is added
+                already
+        """
+        label = label if label is not None else prefix or ''
+        if any((capture.node, capture.label) == (node, label)
+               for capture in self.captures):
+            raise ValueError('Capture {!r} on {!r} is added already'.format(
+                label, node))
+
+        self.captures.append(_Capture(remote, node, label, args=args,
+                                      prefix=prefix, bpf_filter=bpf_filter,
+                                      file_size=file_size,
+                                      file_count=file_count))
+
+    def _by_nodes(self, func):
+        """Call function for captures of each node concurrently.
+
+        Captures of the same node are processed sequentially to share its
+        SSH connection.
+        """
+        nodes = collections.OrderedDict()
+        for capture in self.captures:
+            nodes.setdefault(capture.node, []).append(capture)
+
+        def _process(captures):
+            for capture in captures:
+                func(capture)
+
+        utils.run_concurrently(_process, nodes.values(), workers=self.workers)
+
+    def _start(self, capture):
+        if capture.node not in self.clock_offsets:
+            self.clock_offsets[capture.node] = get_clock_offset(
+                capture.remote)
+        capture.job.start()
+        capture.job.wait_output('listening on', timeout=START_TIMEOUT)
+
+    def _fetch(self, capture):
+        try:
+            capture.job.wait(self.latency)
+        except ssh.ExecutionTimeout:
+            capture.job.signal('KILL')
+            raise
+        _fetch_capture(capture.remote, capture.remote_path,
+                       capture.local_path, merged_path=capture.merged_path)
+
+    def start(self):
+        """Start all captures."""
+        self._by_nodes(self._start)
+        # tcpdump need some more time to start packets capturing
+        time.sleep(self.latency)
+
+    def stop(self, local_dir=None):
+        """Stop all captures and download pcap files.
+
+        Args:
+            local_dir (str, optional): directory for pcap files. By default
+                temporary directory is created.
+        """
+        local_dir = local_dir or tempfile.mkdtemp()
+        for i, capture in enumerate(self.captures):
+            capture.local_path = os.path.join(
+                local_dir, '{}-{}.pcap'.format(capture.node, i))
+
+        # wait some time to allow tcpdump to process all packets
+        time.sleep(self.latency)
+        self._by_nodes(lambda capture: capture.job.signal('INT'))
+        self._by_nodes(self._fetch)
+
+    def cleanup(self):
+        """Kill captures and remove their remote files."""
+        self._by_nodes(lambda capture: capture.job.cleanup())
+
+    @property
+    def files(self):
+        """Downloaded pcap files.
+
+        Returns:
+            collections.OrderedDict: (node, label) -> path to pcap file
+        """
+        return collections.OrderedDict(
+            ((capture.node, capture.label), capture.local_path)
+            for capture in self.captures)
+
+    def _read(self, index, capture, lfilter):
+        offset = self.clock_offsets.get(capture.node, 0)
+        for seq, info in enumerate(read_packet_infos(capture.local_path)):
+            if lfilter is None or lfilter(info):
+                packet = CapturedPacket(info.time - offset, capture.node,
+                                        capture.label, info)
+                # index and seq are to not compare packets on equal times
+                yield packet.time, index, seq, packet
+
+    def packets(self, lfilter=None):
+        """Get packets of all captures ordered by time.
+
+        Args:
+            lfilter (function, optional): function to filter PacketInfo
+                records. By default all packets are returned.
+
+        Yields:
+            CapturedPacket: captured packet with node and capture labels
+        """
+        streams = [self._read(index, capture, lfilter)
+                   for index, capture in enumerate(self.captures)]
+        for _, _, _, packet in heapq.merge(*streams):
+            yield packet
+
+    def get_handovers(self, lfilter=None):
+        """Get moments when traffic moved from one node to another.
+
+        Args:
+            lfilter (function, optional): function to filter PacketInfo
+                records. By default all packets are considered.
+
+        Returns:
+            list: Handover records in time order
+        """
+        handovers = []
+        previous = None
+        for packet in self.packets(lfilter):
+            if previous is not None and packet.node != previous.node:
+                handovers.append(Handover(
+                    from_node=previous.node, to_node=packet.node,
+                    last_time=previous.time, first_time=packet.time,
+                    gap=packet.time - previous.time))
+            previous = packet
+        return handovers
+
+    def __enter__(self):
+        try:
+            self.start()
+        except Exception:
+            self.cleanup()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.stop()
+        finally:
+            self.cleanup()
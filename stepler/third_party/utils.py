@@ -24,7 +24,9 @@ import logging
 import multiprocessing as mp
 import os
 import random
+import sys
 import tempfile
+import threading
 import time
 import uuid
 
@@ -32,6 +34,7 @@ import attrdict
 from hamcrest import equal_to
 import requests
 import six
+from six import moves
 
 from stepler.third_party import context
 from stepler.third_party import waiter
@@ -422,6 +425,60 @@ def grouper(iterable, chunk_size):
         yield chunk
 
 
+def run_concurrently(func, items, workers=None, reraise=True):
+    """Call function for each item in bounded pool of threads.
+
+    Example:
+        >>> run_concurrently(lambda x: x * 2, [1, 2, 3], workers=2)
+        [2, 4, 6]
+
+    Args:
+        func (function): function to call with item
+        items (iterable): items to pass to function
+        workers (int, optional): max count of concurrent calls. By default
+            each item is processed in own thread.
+        reraise (bool, optional): flag whether to re-raise exception of first
+            failed item after all calls are finished or to put exceptions to
+            results instead of failed calls results
+
+    Returns:
+        list: results of function calls in items order
+    """
+    items = list(items)
+    results = [None] * len(items)
+    errors = {}
+    indexes = moves.queue.Queue()
+    for index in range(len(items)):
+        indexes.put(index)
+
+    def _work():
+        while True:
+            try:
+                index = indexes.get_nowait()
+            except moves.queue.Empty:
+                return
+            try:
+                results[index] = func(items[index])
+            except Exception as e:
+                results[index] = e
+                errors[index] = sys.exc_info()
+
+    workers = min(workers or len(items), len(items))
+    if workers <= 1:
+        _work()
+    else:
+        threads = [threading.Thread(target=_work) for _ in range(workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    if errors and reraise:
+        six.reraise(*errors[min(errors)])
+    return results
+
+
 def check_ssh_connection_establishment(server_ssh, must_work=True,
                                        timeout=0):
     """Function to check that ssh connection can be established.
@@ -17,16 +17,35 @@ Waiter
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import functools
+import logging
+import random
+import signal
 import sys
+import threading
+import time
 
 from hamcrest import assert_that
 import six
-import timeout_decorator
+from six import moves
 import waiting
 
 from stepler.third_party import logger
 
+__all__ = [
+    'expect_that',
+    'wait',
+    'ExpectationError',
+    'Polling',
+    'TimeoutExpired',
+    'wait_all',
+    'wait_any',
+    'WaitResults',
+]
+
+LOGGER = logging.getLogger(__name__)
+
 
 @six.python_2_unicode_compatible
 class ExpectationError(Exception):
@@ -69,12 +88,270 @@ class PredicateTimeout(Exception):
     """Predicate timeout exception class."""
 
 
+class _SignalTimeout(object):
+    """Predicate timeout based on ``SIGALRM``.
+
+    Signal handler is installed once on enter and previous handler and its
+    timer are restored on exit. Each call only sets interval timer. It can be
+    used in main thread only.
+    """
+
+    def __init__(self, seconds):
+        self._seconds = seconds
+
+    def _raise_timeout(self, signum, frame):
+        raise PredicateTimeout(
+            'Predicate timeout of {} seconds expired'.format(self._seconds))
+
+    def __enter__(self):
+        self._entered = time.time()
+        self._prev_handler = signal.signal(signal.SIGALRM, self._raise_timeout)
+        self._prev_timer = signal.setitimer(signal.ITIMER_REAL, 0)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        signal.signal(signal.SIGALRM, self._prev_handler)
+        prev_delay, prev_interval = self._prev_timer
+        if prev_delay:
+            # restore outer timer, for ex: pytest-timeout one
+            prev_delay = max(prev_delay - (time.time() - self._entered),
+                             0.001)
+            signal.setitimer(signal.ITIMER_REAL, prev_delay, prev_interval)
+
+    def call(self, func, *args, **kwgs):
+        signal.setitimer(signal.ITIMER_REAL, self._seconds)
+        try:
+            return func(*args, **kwgs)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class _ThreadTimeout(object):
+    """Predicate timeout based on worker thread.
+
+    Predicate is executed in worker thread, which is reused among calls.
+    Hanged predicate can't be interrupted, so its worker is abandoned and
+    next call starts new worker. It can be used in any thread.
+    """
+
+    def __init__(self, seconds):
+        self._seconds = seconds
+        self._tasks = None
+
+    @staticmethod
+    def _work(tasks, results):
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            func, args, kwgs = task
+            try:
+                results.put((True, func(*args, **kwgs)))
+            except Exception:
+                results.put((False, sys.exc_info()))
+
+    def _start_worker(self):
+        self._tasks = moves.queue.Queue()
+        self._results = moves.queue.Queue()
+        worker = threading.Thread(target=self._work,
+                                  args=(self._tasks, self._results))
+        worker.daemon = True
+        worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._tasks is not None:
+            self._tasks.put(None)
+            self._tasks = None
+
+    def call(self, func, *args, **kwgs):
+        if self._tasks is None:
+            self._start_worker()
+        self._tasks.put((func, args, kwgs))
+        try:
+            is_ok, result = self._results.get(timeout=self._seconds)
+        except moves.queue.Empty:
+            self._tasks = None  # abandon hanged worker
+            raise PredicateTimeout(
+                'Predicate timeout of {} seconds expired'.format(
+                    self._seconds))
+        if is_ok:
+            return result
+        six.reraise(*result)
+
+
+class _NoTimeout(object):
+    """Predicate without timeout."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def call(self, func, *args, **kwgs):
+        return func(*args, **kwgs)
+
+
+def _get_predicate_timeout(seconds):
+    """Get predicate timeout suitable for current thread."""
+    if not seconds:
+        return _NoTimeout()
+    if isinstance(threading.current_thread(), threading._MainThread):
+        return _SignalTimeout(seconds)
+    return _ThreadTimeout(seconds)
+
+
+class Polling(object):
+    """Polling policy to calculate delays between predicate executions.
+
+    Delay starts with ``delay`` value, is multiplied by ``multiplier`` after
+    each predicate execution and is limited with ``max_delay``. Each delay is
+    randomly changed by ``jitter`` fraction to avoid simultaneous requests.
+    Omitted values are retrieved from ``stepler.config`` (``POLLING_TIME``,
+    ``POLLING_MULTIPLIER``, ``POLLING_MAX_TIME``, ``POLLING_JITTER``).
+
+    Example:
+        >>> polling = Polling(delay=1, multiplier=2, max_delay=5, jitter=0)
+        >>> list(itertools.islice(polling.delays(), 5))
+        [1, 2, 4, 5, 5]
+    """
+
+    def __init__(self, delay=None, multiplier=None, max_delay=None,
+                 jitter=None):
+        """Constructor.
+
+        Args:
+            delay (float, optional): initial delay in seconds
+            multiplier (float, optional): coefficient to multiply delay
+            max_delay (float, optional): max delay in seconds, ``0`` means
+                unlimited delay
+            jitter (float, optional): max fraction of delay to randomly add or
+                subtract
+        """
+        self.delay = delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def __repr__(self):
+        """Representation."""
+        return ("Polling <delay={0.delay!r} multiplier={0.multiplier!r} "
+                "max_delay={0.max_delay!r} jitter={0.jitter!r}>").format(self)
+
+    @classmethod
+    def from_sleep_seconds(cls, sleep_seconds):
+        """Make polling policy from ``waiting`` library ``sleep_seconds``.
+
+        Args:
+            sleep_seconds (float|tuple): polling time or tuple
+                ``(start, end, multiplier)``
+
+        Returns:
+            Polling: polling policy
+        """
+        if not isinstance(sleep_seconds, (tuple, list)):
+            return cls(delay=sleep_seconds, multiplier=1, jitter=0)
+
+        sleep_seconds = tuple(sleep_seconds)
+        if len(sleep_seconds) == 1:
+            sleep_seconds += (None,)
+        if len(sleep_seconds) == 2:
+            sleep_seconds += (2,)
+        delay, max_delay, multiplier = sleep_seconds
+        return cls(delay=delay, multiplier=multiplier,
+                   max_delay=max_delay or 0, jitter=0)
+
+    def _get_values(self):
+        # TODO(schipiga): thirdparty module should know nothing about stepler
+        # configured values. We hack it for usability.
+        from stepler import config
+
+        def _get(value, default):
+            return default if value is None else value
+
+        return (_get(self.delay, config.POLLING_TIME),
+                _get(self.multiplier, config.POLLING_MULTIPLIER),
+                _get(self.max_delay, config.POLLING_MAX_TIME),
+                _get(self.jitter, config.POLLING_JITTER))
+
+    def delays(self):
+        """Generate delays between predicate executions.
+
+        Yields:
+            float: delay in seconds
+        """
+        delay, multiplier, max_delay, jitter = self._get_values()
+
+        while True:
+            current = min(delay, max_delay) if max_delay else delay
+            if jitter:
+                current *= 1 + random.uniform(-jitter, jitter)
+            yield current
+            delay *= multiplier
+
+
+def _poll(predicate, polling, timeout_seconds=None, waiting_for=None):
+    """Call predicate with polling delays until it returns non-false result.
+
+    Delay is counted from predicate execution start, so slow predicate
+    doesn't extend polling interval.
+    """
+    __tracebackhide__ = True
+    if waiting_for is None:
+        waiting_for = str(predicate)
+    if timeout_seconds is None:
+        deadline = None
+    else:
+        deadline = time.time() + timeout_seconds
+    delays = polling.delays()
+
+    while True:
+        started = time.time()
+        result = predicate()
+        if result:
+            return result
+
+        now = time.time()
+        if deadline is not None and now >= deadline:
+            raise waiting.TimeoutExpired(timeout_seconds, waiting_for)
+
+        delay = next(delays) - (now - started)
+        if deadline is not None:
+            delay = min(delay, deadline - now)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _get_expected_exceptions(expected_exceptions):
+    if isinstance(expected_exceptions, tuple):
+        return expected_exceptions + (ExpectationError, PredicateTimeout)
+    elif (isinstance(expected_exceptions, type) and
+          issubclass(expected_exceptions, Exception)):
+        return (expected_exceptions, ExpectationError, PredicateTimeout)
+    else:
+        raise ValueError('expected_exceptions should be tuple or '
+                         'Exception subclass')
+
+
+def _get_polling(polling, wait_kwargs):
+    if 'sleep_seconds' in wait_kwargs:
+        if polling is not None:
+            raise ValueError("sleep_seconds and polling can't be passed "
+                             "together")
+        polling = Polling.from_sleep_seconds(wait_kwargs.pop('sleep_seconds'))
+    return polling or Polling()
+
+
 @logger.log
 def wait(predicate,
          args=None,
          kwargs=None,
          expected_exceptions=(),
          predicate_timeout=None,
+         polling=None,
          **wait_kwargs):
     """Wait that predicate execution returns non-false result.
 
@@ -103,8 +380,11 @@ def wait(predicate,
     Args:
         predicate (function): predicate to wait execution result
         timeout_seconds (int): seconds to wait result
-        sleep_seconds (float): polling time between predicate executions
-        multiplier (int): coefficient to multiply polling time
+        sleep_seconds (float|tuple): constant polling time between predicate
+            executions or tuple ``(start, end, multiplier)`` like in
+            ``waiting`` library. Can't be used together with ``polling``.
+        polling (Polling, optional): polling policy. By default polling
+            values are retrieved from ``stepler.config``.
         expected_exceptions (tuple): predicate exceptions which will be omitted
             during waiting.
         predicate_timeout (int): max predicate execution timeout. Equals to
@@ -125,30 +405,21 @@ def wait(predicate,
     kwargs = kwargs or {}
     predicate_timeout = predicate_timeout or wait_kwargs.get('timeout_seconds',
                                                              60)
-
-    if isinstance(expected_exceptions, tuple):
-        expected_exceptions += (ExpectationError, PredicateTimeout)
-    elif (isinstance(expected_exceptions, type) and
-          issubclass(expected_exceptions, Exception)):
-        expected_exceptions = (expected_exceptions, ExpectationError,
-                               PredicateTimeout)
-    else:
-        raise ValueError('expected_exceptions should be tuple or '
-                         'Exception subclass')
+    expected_exceptions = _get_expected_exceptions(expected_exceptions)
+    polling = _get_polling(polling, wait_kwargs)
+    timeout = _get_predicate_timeout(predicate_timeout)
 
     @functools.wraps(predicate)
     def wrapper():
         try:
-            _predicate = timeout_decorator.timeout(
-                predicate_timeout,
-                timeout_exception=PredicateTimeout)(predicate)
-            return _predicate(*args, **kwargs)
+            return timeout.call(predicate, *args, **kwargs)
         except expected_exceptions as e:
             raised_exceptions.append(e)
             return False
 
     try:
-        return waiting.wait(wrapper, **wait_kwargs)
+        with timeout:
+            return _poll(wrapper, polling, **wait_kwargs)
     except waiting.TimeoutExpired as e:
         ex = TimeoutExpired(e)
         if raised_exceptions:
@@ -157,3 +428,163 @@ def wait(predicate,
         else:
             ex.message += "\nNo exception raised during predicate executing"
         raise ex
+
+
+class WaitResults(collections.OrderedDict):
+    """Results of predicates settled during ``wait_all`` or ``wait_any``.
+
+    It maps predicate key to its result in settling order. Attribute
+    ``elapsed`` maps predicate key to seconds spent until it was settled.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(WaitResults, self).__init__(*args, **kwargs)
+        self.elapsed = {}
+
+
+def _wait_many(predicates,
+               required,
+               expected_exceptions=(),
+               predicate_timeout=None,
+               polling=None,
+               refresh=None,
+               **wait_kwargs):
+    __tracebackhide__ = True
+    if not isinstance(predicates, dict):
+        predicates = collections.OrderedDict(enumerate(predicates))
+    pending = collections.OrderedDict(predicates)
+    required = min(required, len(pending))
+    results = WaitResults()
+    raised_exceptions = {}
+
+    predicate_timeout = predicate_timeout or wait_kwargs.get('timeout_seconds',
+                                                             60)
+    expected_exceptions = _get_expected_exceptions(expected_exceptions)
+    polling = _get_polling(polling, wait_kwargs)
+    timeout = _get_predicate_timeout(predicate_timeout)
+    wait_kwargs.setdefault(
+        'waiting_for', '{} of {} predicates'.format(required, len(pending)))
+    started = time.time()
+
+    def _check_pending():
+        if refresh is not None:
+            try:
+                timeout.call(refresh, list(pending))
+            except expected_exceptions as e:
+                for key in pending:
+                    raised_exceptions[key] = e
+                return False
+
+        for key, predicate in list(pending.items()):
+            try:
+                result = timeout.call(predicate)
+            except expected_exceptions as e:
+                raised_exceptions[key] = e
+                continue
+            if result:
+                results[key] = result
+                results.elapsed[key] = time.time() - started
+                LOGGER.debug('Predicate {!r} is settled in {:.4f} sec'.format(
+                    key, results.elapsed[key]))
+                del pending[key]
+                if len(results) >= required:
+                    return True
+        return len(results) >= required
+
+    try:
+        with timeout:
+            _poll(_check_pending, polling, **wait_kwargs)
+    except waiting.TimeoutExpired as e:
+        ex = TimeoutExpired(e)
+        for key in pending:
+            ex.message += "\n{}: ".format(key)
+            if key in raised_exceptions:
+                ex.message += "{0}: {1}".format(
+                    type(raised_exceptions[key]).__name__,
+                    raised_exceptions[key])
+            else:
+                ex.message += "No exception raised during predicate executing"
+        raise ex
+
+    return results
+
+
+@logger.log
+def wait_all(predicates,
+             expected_exceptions=(),
+             predicate_timeout=None,
+             polling=None,
+             refresh=None,
+             **wait_kwargs):
+    """Wait that all predicates executions return non-false results.
+
+    All predicates are polled in one loop and each predicate is dropped from
+    polling once it returns non-false result. On timeout the last caught
+    exception of each unsettled predicate is put to TimeoutExpired message.
+
+    Example:
+        >>> results = wait_all({server.id: functools.partial(is_active, server)
+        ...                     for server in servers}, timeout_seconds=300)
+        >>> results.elapsed
+        {u'8a1c...': 12.1, u'f3e0...': 15.4}
+
+    Args:
+        predicates (dict|list): predicates to wait; dict maps any hashable key
+            (for ex: resource id) to predicate, list items are keyed by index
+        timeout_seconds (int): seconds to wait results
+        sleep_seconds (float|tuple): polling time like in ``wait``. Can't be
+            used together with ``polling``.
+        polling (Polling, optional): polling policy
+        expected_exceptions (tuple): predicate exceptions which will be omitted
+            during waiting.
+        predicate_timeout (int): max execution timeout of each predicate.
+            Equals to timeout_seconds by default.
+        refresh (function, optional): function which is called once per
+            polling iteration with keys of unsettled predicates before their
+            executions, for ex: to refresh all waited resources with one API
+            request.
+        waiting_for (str): custom waiting message.
+
+    Returns:
+        WaitResults: results of predicates executions
+
+    Raises:
+        TimeoutExpired: if any predicate execution has false value after
+            timeout
+    """
+    __tracebackhide__ = True
+    return _wait_many(predicates,
+                      required=len(predicates),
+                      expected_exceptions=expected_exceptions,
+                      predicate_timeout=predicate_timeout,
+                      polling=polling,
+                      refresh=refresh,
+                      **wait_kwargs)
+
+
+@logger.log
+def wait_any(predicates,
+             expected_exceptions=(),
+             predicate_timeout=None,
+             polling=None,
+             refresh=None,
+             **wait_kwargs):
+    """Wait that any of predicates executions returns non-false result.
+
+    Args are the same as for ``wait_all``.
+
+    Returns:
+        WaitResults: results of settled predicates (at least one)
+
+    Raises:
+        TimeoutExpired: if all predicates executions have false values after
+            timeout
+    """
+    __tracebackhide__ = True
+    return _wait_many(predicates,
+                      required=1,
+                      expected_exceptions=expected_exceptions,
+                      predicate_timeout=predicate_timeout,
+                      polling=polling,
+                      refresh=refresh,
+                      **wait_kwargs)
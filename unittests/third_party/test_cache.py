@@ -0,0 +1,63 @@
+"""
+---------------
+Cache unittests
+---------------
+"""
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from hamcrest import assert_that, equal_to, is_, is_not  # noqa H301
+
+from stepler.third_party import cache
+
+
+def test_cached_value_is_reused():
+    """Check that factory is called once per key."""
+    calls = []
+
+    def factory(value):
+        calls.append(value)
+        return object()
+
+    objects = cache.Cache()
+    first = objects.get('key', factory, 1)
+    second = objects.get('key', factory, 2)
+
+    assert_that(first, is_(second))
+    assert_that(calls, equal_to([1]))
+    assert_that((objects.hits, objects.misses), equal_to((1, 1)))
+
+
+def test_invalidate_key():
+    """Check that only invalidated key is recreated."""
+    objects = cache.Cache()
+    first = objects.get('first', object)
+    second = objects.get('second', object)
+
+    objects.invalidate('first')
+
+    assert_that(objects.get('first', object), is_not(first))
+    assert_that(objects.get('second', object), is_(second))
+
+
+def test_invalidate_all():
+    """Check that all caches are invalidated."""
+    caches = [cache.Cache(), cache.Cache()]
+    for objects in caches:
+        objects.get('key', object)
+
+    cache.invalidate_all()
+
+    for objects in caches:
+        assert_that('key' in objects, is_(False))
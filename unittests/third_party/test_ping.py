@@ -0,0 +1,126 @@
+"""
+---------------------
+Ping helper unittests
+---------------------
+"""
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+
+from hamcrest import assert_that, equal_to  # noqa H301
+import mock
+
+from stepler.third_party import ping
+from stepler.third_party import ssh
+
+PING_OUTPUT = """PING {ip} ({ip}) 56(84) bytes of data.
+
+--- {ip} ping statistics ---
+3 packets transmitted, {received} received, 0% packet loss, time 2002ms
+"""
+
+
+def create_remote(host, unreachable_ips):
+    remote = mock.Mock(host=host, closed=False)
+
+    def execute_batch(commands, **kwargs):
+        results = []
+        for command in commands:
+            ip = command.split()[-1]
+            received = 0 if ip in unreachable_ips else 3
+            result = ssh.CommandResult()
+            result.append_stdout(
+                PING_OUTPUT.format(ip=ip, received=received).encode())
+            results.append(result)
+        return results
+
+    remote.execute_batch.side_effect = execute_batch
+    return remote
+
+
+def test_ping_matrix_reprobes_failed_pairs():
+    """Check that only failed pairs are pinged again."""
+    remote_1 = create_remote('10.0.0.1', unreachable_ips=['10.0.0.3'])
+    remote_2 = create_remote('10.0.0.2', unreachable_ips=[])
+    matrix = ping.PingMatrix(collections.OrderedDict([
+        (remote_1, ['10.0.0.2', '10.0.0.3']),
+        (remote_2, ['10.0.0.1'])]))
+
+    assert_that(matrix.probe(), equal_to([(remote_1, '10.0.0.3')]))
+    assert_that(str(matrix), equal_to(
+        '10.0.0.1 -> 10.0.0.2: ok\n'
+        '10.0.0.1 -> 10.0.0.3: 3 of 3 packets are lost\n'
+        '10.0.0.2 -> 10.0.0.1: ok'))
+
+    assert_that(matrix.probe(), equal_to([(remote_1, '10.0.0.3')]))
+    remote_1.execute_batch.assert_called_with(['ping -c3 10.0.0.3'],
+                                              parallel=True, timeout=30)
+    assert_that(remote_2.execute_batch.call_count, equal_to(1))
+
+
+def test_icmp_checksum():
+    """Check that checksum of packet with its checksum is zero."""
+    packet = bytearray(b'\x08\x00\x00\x00\x12\x34\x00\x01abc')
+    checksum = ping._checksum(packet)
+    packet[2:4] = bytearray([checksum >> 8, checksum & 0xff])
+
+    assert_that(ping._checksum(packet), equal_to(0))
+
+
+def test_multi_pinger_tcp_probes():
+    """Check that refused TCP connection is counted as reply."""
+    pinger = ping.MultiPinger(['127.0.0.1'], interval=0.01, timeout=1,
+                              mode='tcp', tcp_port=1)
+    stats = pinger.ping(count=3)['127.0.0.1']
+
+    assert_that((stats.transmitted, stats.received), equal_to((3, 3)))
+    assert_that(len(stats.rtts), equal_to(3))
+
+
+def test_ping_result_gaps():
+    """Check that ping output is parsed to RTTs and gaps."""
+    result = ping.PingResult()
+    result.stdout = b"""PING 10.0.0.1 (10.0.0.1) 56(84) bytes of data.
+[1480000000.10] 64 bytes from 10.0.0.1: icmp_seq=1 ttl=64 time=0.5 ms
+[1480000003.60] 64 bytes from 10.0.0.1: icmp_seq=4 ttl=64 time=1.5 ms
+
+--- 10.0.0.1 ping statistics ---
+5 packets transmitted, 2 received, 60% packet loss, time 4004ms
+rtt min/avg/max/mdev = 0.500/1.000/1.500/0.500 ms
+"""
+
+    assert_that((result.transmitted, result.received), equal_to((5, 2)))
+    assert_that(result.rtts, equal_to([0.5, 1.5]))
+    assert_that(result.stats.rtt_mdev, equal_to(0.5))
+    assert_that(result.gaps, equal_to([ping.Gap(2, 3, 2.5),
+                                       ping.Gap(5, 5, 1)]))
+    assert_that(result.max_gap, equal_to(2.5))
+
+
+def test_busybox_ping_result():
+    """Check that busybox ping output is parsed."""
+    result = ping.PingResult()
+    result.stdout = """PING 10.0.0.1 (10.0.0.1): 56 data bytes
+64 bytes from 10.0.0.1: seq=0 ttl=64 time=1.000 ms
+64 bytes from 10.0.0.1: seq=2 ttl=64 time=3.000 ms
+
+--- 10.0.0.1 ping statistics ---
+3 packets transmitted, 2 packets received, 33% packet loss
+round-trip min/avg/max = 1.000/2.000/3.000 ms
+"""
+
+    assert_that(result.loss, equal_to(1))
+    assert_that(result.stats.rtt_mdev, equal_to(1))
+    assert_that(result.gaps, equal_to([ping.Gap(1, 1, 1)]))
@@ -0,0 +1,260 @@
+"""
+-------------
+SSH unittests
+-------------
+"""
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from hamcrest import (assert_that, calling, equal_to, instance_of, is_,
+                      is_not, raises)  # noqa H301
+import mock
+import pytest
+
+from stepler.third_party import ssh
+
+
+def create_ssh():
+    ssh_client = mock.Mock()
+    ssh_client.get_transport.return_value.is_active.return_value = True
+    return ssh_client
+
+
+@pytest.fixture
+def pool():
+    return ssh.SshPool(idle_ttl=60, max_size=2)
+
+
+def test_pool_reuses_connection(pool):
+    """Check that released connection is reused."""
+    ssh_1 = pool.acquire('host', create_ssh)
+    pool.release('host', ssh_1)
+    ssh_2 = pool.acquire('host', create_ssh)
+
+    assert_that(ssh_2, is_(ssh_1))
+    assert_that((pool.hits, pool.misses), equal_to((1, 1)))
+
+
+def test_pool_shares_connection(pool):
+    """Check that connection in use is shared between clients."""
+    ssh_1 = pool.acquire('host', create_ssh)
+    ssh_2 = pool.acquire('host', create_ssh)
+
+    assert_that(ssh_2, is_(ssh_1))
+    assert_that(len(pool), equal_to(1))
+
+
+def test_pool_replaces_dead_connection(pool):
+    """Check that dead connection is closed and replaced."""
+    ssh_1 = pool.acquire('host', create_ssh)
+    pool.release('host', ssh_1)
+    ssh_1.get_transport.return_value.is_active.return_value = False
+    ssh_2 = pool.acquire('host', create_ssh)
+
+    assert_that(ssh_2, is_not(ssh_1))
+    assert_that(ssh_1.close.called, is_(True))
+    assert_that((pool.hits, pool.misses), equal_to((0, 2)))
+
+
+def test_pool_evicts_idle_connections(pool):
+    """Check that idle connections are evicted by TTL and LRU."""
+    ssh_1 = pool.acquire('host_1', create_ssh)
+    ssh_2 = pool.acquire('host_2', create_ssh)
+    pool.release('host_1', ssh_1)
+    pool.acquire('host_3', create_ssh)
+
+    assert_that(ssh_1.close.called, is_(True))
+    assert_that(len(pool), equal_to(2))
+
+    pool.release('host_2', ssh_2)
+    pool.idle_ttl = -1
+    pool.acquire('host_3', create_ssh)
+
+    assert_that(ssh_2.close.called, is_(True))
+    assert_that(len(pool), equal_to(1))
+
+
+def test_pooled_ssh_client(pool):
+    """Check that pooled SSH clients with same credentials share connection."""
+    with mock.patch.object(ssh, 'pool', pool), \
+            mock.patch.object(ssh.SshClient, '_create_ssh',
+                              side_effect=lambda: create_ssh()):
+        with ssh.SshClient('host', username='user') as client_1:
+            with ssh.SshClient('host', username='user') as client_2:
+                assert_that(client_2._ssh, is_(client_1._ssh))
+
+            with ssh.SshClient('host', username='admin') as client_3:
+                assert_that(client_3._ssh, is_not(client_1._ssh))
+
+    assert_that((pool.hits, pool.misses), equal_to((1, 2)))
+
+
+def create_client(host, exit_code=0, error=None):
+    client = mock.Mock(host=host, closed=False)
+    if error:
+        client.execute.side_effect = error
+    else:
+        result = ssh.CommandResult()
+        result.exit_code = exit_code
+        client.execute.return_value = result
+    return client
+
+
+def test_group_execute():
+    """Check that group results are keyed by host and errors are kept."""
+    clients = [create_client('host_1'),
+               create_client('host_2', exit_code=1),
+               create_client('host_3', error=ssh.ExecutionTimeout('timeout'))]
+    results = ssh.SshClient.execute_many(clients, 'hostname',
+                                         timeout={'host_1': 5})
+
+    assert_that(list(results), equal_to(['host_1', 'host_2']))
+    assert_that(results.errors['host_3'], instance_of(ssh.ExecutionTimeout))
+    assert_that(results.is_ok, is_(False))
+    clients[0].execute.assert_called_once_with('hostname', timeout=5)
+    clients[1].execute.assert_called_once_with('hostname', timeout=None)
+    assert_that(calling(results.check_exit_code),
+                raises(RuntimeError, 'host_2: exit code is 1'))
+
+
+def test_group_unique_hosts():
+    """Check that group hosts should be unique."""
+    assert_that(calling(ssh.SshGroup).with_args(
+        [create_client('host'), create_client('host')]), raises(ValueError))
+
+
+def test_output_buffer_spill():
+    """Check that big output is moved to temporary file."""
+    output = ssh.OutputBuffer(spill_size=4)
+    output.append(b'abc')
+    assert_that(output.spilled, is_(False))
+    output.append(b'def')
+    output.append(b'gh')
+
+    assert_that(output.spilled, is_(True))
+    assert_that(len(output), equal_to(8))
+    assert_that(output.getvalue(), equal_to(b'abcdefgh'))
+    with output.open() as f:
+        assert_that(f.read(3), equal_to(b'abc'))
+    output.append(b'i')
+    assert_that(output.getvalue(), equal_to(b'abcdefghi'))
+
+
+def test_lines_callback():
+    """Check that output is passed to callback by lines."""
+    lines = []
+    callback = ssh._LinesCallback(lambda *args: lines.append(args))
+    callback(b'line 1\nli', False)
+    callback(b'error\n', True)
+    callback(b'ne 2\nline', False)
+    callback.flush()
+
+    assert_that(lines, equal_to([(b'line 1\n', False),
+                                 (b'error\n', True),
+                                 (b'line 2\n', False),
+                                 (b'line', False)]))
+
+
+class FakeChannel(object):
+    """Channel which has all command output received."""
+
+    closed = False
+    eof_received = True
+
+    def __init__(self, stdout):
+        self._stdout = [stdout]
+
+    def recv_ready(self):
+        return bool(self._stdout)
+
+    def recv(self, size):
+        return self._stdout.pop(0)
+
+    def recv_stderr_ready(self):
+        return False
+
+    def exit_status_ready(self):
+        return True
+
+    def recv_exit_status(self):
+        return 0
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_execute_strips_pid_and_calls_hooks():
+    """Check that reported pid is stripped and command hooks are called."""
+    chan = FakeChannel(b'123\nout\n')
+    hook = mock.Mock()
+    with mock.patch.object(ssh.SshClient, 'execute_async',
+                           return_value=(chan, mock.Mock(), mock.Mock(),
+                                         mock.Mock())) as execute_async, \
+            mock.patch.object(ssh, 'command_hooks', [hook]):
+        client = ssh.SshClient('host')
+        result = client.execute('echo out', timeout=5)
+
+    execute_async.assert_called_once_with('echo out', merge_stderr=False,
+                                          report_pid=True)
+    assert_that(result.stdout, equal_to('out'))
+    assert_that(hook.call_args[0][:2], equal_to((client, result)))
+
+
+def test_get_many_reuses_sftp():
+    """Check that files are downloaded with same SFTP session."""
+    client = ssh.SshClient('host')
+    client._ssh = create_ssh()
+    client._ssh.open_sftp.return_value.sock.closed = False
+    paths = client.get_many(['/tmp/a.pcap', '/var/b.pcap'], local_dir='/dst')
+
+    assert_that(list(paths.values()), equal_to(['/dst/a.pcap', '/dst/b.pcap']))
+    assert_that(client._ssh.open_sftp.call_count, equal_to(1))
+    assert_that(calling(client.get_many).with_args(['/a/log', '/b/log']),
+                raises(ValueError))
+
+
+def test_execute_batch():
+    """Check that batch output is split to results of commands."""
+    batch_result = ssh.CommandResult()
+    batch_result.exit_code = 0
+    batch_result.append_stdout(b'out\n\nstepler-x 0 0\n\nstepler-x 1 2\n')
+    batch_result.append_stderr(b'\nstepler-x 0\nerr\n\nstepler-x 1\n')
+    client = ssh.SshClient('host')
+    with mock.patch.object(ssh.uuid, 'uuid4',
+                           return_value=mock.Mock(hex='x')):
+        with mock.patch.object(client, 'execute', return_value=batch_result):
+            results = client.execute_batch(['echo out', 'ls /absent'])
+
+    results = [(result.command, result.stdout_bytes, result.stderr_bytes,
+                result.exit_code) for result in results]
+    assert_that(results,
+                equal_to([('echo out', b'out\n', b'', 0),
+                          ('ls /absent', b'', b'err\n', 2)]))
+
+
+def test_remote_job_output():
+    """Check that remote job reports its pid and streams output."""
+    chan = FakeChannel(b'123\nout\n')
+    client = ssh.SshClient('host')
+    with mock.patch.object(client, 'execute_async',
+                           return_value=(chan, None, None, None)):
+        job = ssh.RemoteJob(client, 'ping 10.0.0.1')
+        job.start()
+
+    assert_that(job.pid, equal_to(123))
+    assert_that(job.wait(timeout=1).stdout, equal_to('out'))
+    assert_that(job.running, is_(False))
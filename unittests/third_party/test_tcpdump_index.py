@@ -0,0 +1,96 @@
+"""
+--------------------
+Pcap index unittests
+--------------------
+"""
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+
+from hamcrest import assert_that, equal_to, has_length  # noqa H301
+import pytest
+import scapy.all as scapy
+
+from stepler.third_party import pcap
+from stepler.third_party import tcpdump
+
+
+@pytest.fixture
+def pcap_path(tmpdir):
+    packets = [
+        scapy.Ether() / scapy.IP(src='10.0.0.1', dst='10.0.0.2') /
+        scapy.ICMP(type=8, id=7),
+        scapy.Ether() / scapy.IP(src='10.0.0.2', dst='10.0.0.1') /
+        scapy.ICMP(type=0, id=7),
+        scapy.Ether() / scapy.ARP(psrc='10.0.0.3', pdst='10.0.0.4'),
+        scapy.Ether() / scapy.Dot1Q(vlan=5) /
+        scapy.IP(src='1.1.1.1', dst='2.2.2.2') /
+        scapy.UDP(sport=1234, dport=4789) / scapy.VXLAN(vni=42) /
+        scapy.Ether() / scapy.IP(src='192.168.0.1', dst='192.168.0.2') /
+        scapy.ICMP(type=0),
+    ]
+    for i, packet in enumerate(packets):
+        packet.time = 1480000000 + i * 0.25
+    path = str(tmpdir.join('test.pcap'))
+    scapy.wrpcap(path, packets)
+    return path
+
+
+def test_fast_parser_matches_scapy(pcap_path):
+    """Check that fast headers parser gives the same summaries as scapy."""
+    expected = [tcpdump._packet_info_from_scapy(packet, packet.time)
+                for packet in scapy.rdpcap(pcap_path)]
+
+    assert_that(list(tcpdump.read_packet_infos(pcap_path)),
+                equal_to(expected))
+
+
+def test_pcap_index_query(pcap_path):
+    """Check that indexed packets are queried by fields."""
+    index = tcpdump.get_pcap_index(pcap_path)
+
+    assert_that(tcpdump.get_pcap_index(pcap_path), equal_to(index))
+    assert_that(index.query(proto='arp', src='10.0.0.3'), has_length(1))
+    assert_that(index.query(proto='icmp', icmp_type=0, dst='10.0.0.2'),
+                has_length(0))
+    vxlan_packets = index.query(proto='vxlan',
+                                inner={'proto': 'icmp', 'src': '192.168.0.1'})
+    assert_that([packet.vni for packet in vxlan_packets], equal_to([42]))
+    assert_that(tcpdump.get_last_ping_reply_ts(pcap_path),
+                equal_to(1480000000.75))
+
+
+def test_remote_summary(pcap_path, tmpdir):
+    """Check that flows summary is computed by shell command."""
+    ring_path = str(tmpdir.join('ring.pcap'))
+    packets = scapy.rdpcap(pcap_path)
+    scapy.wrpcap(ring_path + '0', packets[:2])
+    scapy.wrpcap(ring_path + '1', packets[2:])
+    os.utime(ring_path + '0', (1, 1))
+    merged_path = str(tmpdir.join('merged.pcap'))
+    subprocess.check_call(tcpdump.get_merge_cmd(ring_path, merged_path),
+                          shell=True)
+    output = subprocess.check_output(tcpdump.get_summary_cmd(ring_path),
+                                     shell=True)
+    flows = pcap.load_summary(output.decode())
+
+    assert_that(list(tcpdump.read_packet_infos(merged_path)),
+                equal_to(list(tcpdump.read_packet_infos(pcap_path))))
+    assert_that(flows, has_length(4))
+    assert_that(flows[0][:4], equal_to(('icmp', '10.0.0.1', '10.0.0.2', None)))
+    assert_that(flows[3].inner.src, equal_to('192.168.0.1'))
+    assert_that((flows[3].count, flows[3].first, flows[3].last),
+                equal_to((1, 1480000000.75, 1480000000.75)))
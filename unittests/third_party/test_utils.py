@@ -17,7 +17,11 @@ Utils unittests
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from hamcrest import (assert_that, contains)  # noqa H301
+import threading
+import time
+
+from hamcrest import (assert_that, calling, contains, equal_to, instance_of,
+                      less_than_or_equal_to, raises)  # noqa H301
 import pytest
 
 from stepler.third_party import utils
@@ -34,3 +38,37 @@ def test_grouper(iterable, chunk_size, expected):
     """Verify correct grouping."""
     result = utils.grouper(iterable, chunk_size)
     assert_that(list(result), contains(*expected))
+
+
+def test_run_concurrently():
+    """Verify that results order is kept and concurrency is bounded."""
+    lock = threading.Lock()
+    active = []
+    max_active = []
+
+    def func(item):
+        with lock:
+            active.append(item)
+            max_active.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(item)
+        return item * 2
+
+    results = utils.run_concurrently(func, range(10), workers=3)
+    assert_that(results, equal_to([item * 2 for item in range(10)]))
+    assert_that(max(max_active), less_than_or_equal_to(3))
+
+
+def test_run_concurrently_errors():
+    """Verify that errors are re-raised or put to results."""
+    def func(item):
+        if item % 2:
+            raise ValueError(item)
+        return item
+
+    assert_that(calling(utils.run_concurrently).with_args(func, range(4)),
+                raises(ValueError, '^1$'))
+    results = utils.run_concurrently(func, range(4), reraise=False)
+    assert_that(results[::2], equal_to([0, 2]))
+    assert_that(results[1], instance_of(ValueError))
@@ -17,10 +17,14 @@ Waiter unittests
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import itertools
 import logging
+import threading
+import time
 
-from hamcrest import (assert_that, calling, raises, is_,
-                      string_contains_in_order)  # noqa H301
+from hamcrest import (all_of, assert_that, calling, contains_string,
+                      equal_to, greater_than_or_equal_to, is_,
+                      less_than_or_equal_to, raises, string_contains_in_order)  # noqa H301
 import pytest
 
 from stepler.third_party import waiter
@@ -112,3 +116,175 @@ def test_not_in_expected_exceptions():
             timeout_seconds=0,
             expected_exceptions=ValueError),
         raises(AttributeError, 'AttributeError was thrown.'))
+
+
+def test_polling_delays():
+    """Check that polling delays grow up to max delay."""
+    polling = waiter.Polling(delay=1, multiplier=2, max_delay=5, jitter=0)
+    delays = list(itertools.islice(polling.delays(), 5))
+    assert_that(delays, equal_to([1, 2, 4, 5, 5]))
+
+
+def test_polling_jitter():
+    """Check that polling delays are randomized within jitter."""
+    polling = waiter.Polling(delay=10, multiplier=1, max_delay=10, jitter=0.1)
+    for delay in itertools.islice(polling.delays(), 100):
+        assert_that(delay, all_of(greater_than_or_equal_to(9),
+                                  less_than_or_equal_to(11)))
+
+
+@pytest.mark.parametrize('sleep_seconds, expected', [
+    (2, [2, 2, 2]),
+    ((1, 3), [1, 2, 3]),
+    ((1, None, 3), [1, 3, 9]),
+])
+def test_polling_from_sleep_seconds(sleep_seconds, expected):
+    """Check compatibility with ``waiting`` library sleep_seconds."""
+    polling = waiter.Polling.from_sleep_seconds(sleep_seconds)
+    delays = list(itertools.islice(polling.delays(), 3))
+    assert_that(delays, equal_to(expected))
+
+
+def test_wait_with_polling():
+    """Check that predicate is polled until success."""
+    calls = []
+
+    def predicate():
+        calls.append(1)
+        return len(calls) == 3
+
+    polling = waiter.Polling(delay=0.01, multiplier=1, jitter=0)
+    waiter.wait(predicate, timeout_seconds=1, polling=polling)
+    assert_that(len(calls), equal_to(3))
+
+
+def test_sleep_seconds_with_polling():
+    """Check that sleep_seconds and polling can't be passed together."""
+    assert_that(
+        calling(waiter.wait).with_args(
+            lambda: True,
+            timeout_seconds=0,
+            sleep_seconds=1,
+            polling=waiter.Polling()),
+        raises(ValueError))
+
+
+def hanged_predicate():
+    time.sleep(1)
+    return True
+
+
+def test_predicate_timeout():
+    """Check that hanged predicate is interrupted in main thread."""
+    start = time.time()
+    assert_that(
+        calling(waiter.wait).with_args(
+            hanged_predicate,
+            timeout_seconds=0.3,
+            predicate_timeout=0.1),
+        raises(waiter.TimeoutExpired, 'PredicateTimeout'))
+    assert_that(time.time() - start, less_than_or_equal_to(0.9))
+
+
+def test_predicate_timeout_in_thread():
+    """Check that hanged predicate is interrupted in non-main thread."""
+    errors = []
+
+    def target():
+        try:
+            waiter.wait(hanged_predicate,
+                        timeout_seconds=0.3,
+                        predicate_timeout=0.1)
+        except waiter.TimeoutExpired as e:
+            errors.append(e)
+
+    start = time.time()
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join(2)
+    assert_that(time.time() - start, less_than_or_equal_to(0.9))
+    assert_that(len(errors), equal_to(1))
+    assert_that(str(errors[0]), contains_string('PredicateTimeout'))
+
+
+@pytest.mark.parametrize('in_thread', [False, True])
+def test_predicate_timeout_overhead(in_thread):
+    """Check that predicate timeout overhead per poll is small."""
+    polls = 1000
+    calls = []
+    overheads = []
+
+    def predicate():
+        calls.append(1)
+        return len(calls) == polls
+
+    def target():
+        polling = waiter.Polling(delay=0, multiplier=1, jitter=0)
+        start = time.time()
+        waiter.wait(predicate, timeout_seconds=10, polling=polling)
+        overheads.append((time.time() - start) / polls)
+
+    if in_thread:
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join(10)
+    else:
+        target()
+
+    assert_that(overheads[0], less_than_or_equal_to(0.005))
+
+
+def test_wait_all():
+    """Check that settled predicates are dropped from polling."""
+    calls = {'a': 0, 'b': 0}
+
+    def predicate(key, ready_after):
+        calls[key] += 1
+        return calls[key] >= ready_after and key
+
+    polling = waiter.Polling(delay=0.01, multiplier=1, jitter=0)
+    results = waiter.wait_all({'a': lambda: predicate('a', 1),
+                               'b': lambda: predicate('b', 3)},
+                              timeout_seconds=1, polling=polling)
+
+    assert_that(results, equal_to({'a': 'a', 'b': 'b'}))
+    assert_that(list(results), equal_to(['a', 'b']))
+    assert_that(calls, equal_to({'a': 1, 'b': 3}))
+    assert_that(results.elapsed['a'],
+                less_than_or_equal_to(results.elapsed['b']))
+
+
+def test_wait_all_raises_timeout_expired():
+    """Check that last exception of each pending predicate is reported."""
+    assert_that(
+        calling(waiter.wait_all).with_args(
+            [lambda: True, expect_predicate, simple_predicate],
+            timeout_seconds=0.1),
+        raises(waiter.TimeoutExpired,
+               r"1: ExpectationError:\s+Expected: <2>\s+but: was <1>\s+"
+               r"2: No exception raised during predicate executing"))
+
+
+def test_wait_any():
+    """Check that wait is finished after first settled predicate."""
+    results = waiter.wait_any([simple_predicate, lambda: 'ok'],
+                              timeout_seconds=1)
+    assert_that(results, equal_to({1: 'ok'}))
+
+
+def test_wait_all_refresh():
+    """Check that refresh is called once per polling with pending keys."""
+    statuses = {'a': 'build', 'b': 'build'}
+    refreshes = []
+
+    def refresh(keys):
+        refreshes.append(sorted(keys))
+        statuses['a'] = 'active'
+        if len(refreshes) == 2:
+            statuses['b'] = 'active'
+
+    polling = waiter.Polling(delay=0.01, multiplier=1, jitter=0)
+    waiter.wait_all({key: lambda key=key: statuses[key] == 'active'
+                     for key in statuses},
+                    timeout_seconds=1, polling=polling, refresh=refresh)
+    assert_that(refreshes, equal_to([['a', 'b'], ['b']]))